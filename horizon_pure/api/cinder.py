@@ -13,12 +13,25 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from django.conf import settings
+
 from openstack_dashboard.api import cinder
 
 
-class PureVolume(cinder.Volume):
-    _pure_attrs = [
+# Number of Cinder volumes fetched per request when listing every volume
+VOLUME_LIST_BATCH_SIZE = 500
+
+
+class PureVolumeStats(object):
+    """Purity space and performance metrics of a single volume.
+
+    Uses slots rather than a per instance dict since admin listings build
+    one of these for every volume on the page.
+    """
+    __slots__ = (
         'total',
+        'snapshots',
+        'volumes',
         'data_reduction',
         'thin_provisioning',
         'total_reduction',
@@ -28,8 +41,64 @@ class PureVolume(cinder.Volume):
         'input_per_sec',
         'usec_per_read_op',
         'usec_per_write_op',
-    ]
+    )
+
+    def __init__(self, stats=None):
+        if stats:
+            for key in self.__slots__:
+                if key in stats:
+                    setattr(self, key, stats[key])
+
+    def to_dict(self):
+        obj = {}
+        for key in self.__slots__:
+            if hasattr(self, key):
+                obj[key] = getattr(self, key)
+        return obj
+
 
-    def __init__(self, apiresource):
+class PureVolume(cinder.Volume):
+    """A Cinder volume with the Purity metrics of its array volume.
+
+    Wraps the Cinder volume as is, without copying it into a new dict, and
+    serves the Purity metrics from a PureVolumeStats record.
+    """
+    _pure_attrs = PureVolumeStats.__slots__
+    _pure_stats = None
+
+    def __init__(self, apiresource, pure_stats=None):
         super(PureVolume, self).__init__(apiresource)
-        self._attrs = self._attrs + self._pure_attrs
+        if pure_stats is None:
+            pure_stats = PureVolumeStats()
+        self._pure_stats = pure_stats
+
+    def __getattr__(self, attr):
+        # Only called when the normal lookup failed
+        if attr in self._pure_attrs:
+            return getattr(self._pure_stats, attr)
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        # Attributes the volume views set on the Cinder volume wrapper
+        return getattr(self._apiresource, attr)
+
+    def to_dict(self):
+        obj = super(PureVolume, self).to_dict()
+        obj.update(self._pure_stats.to_dict())
+        return obj
+
+
+def volume_list_all_paged(request):
+    """Yields every Cinder volume of every project, one page at a time."""
+    batch_size = getattr(settings, 'PURE_VOLUME_LIST_BATCH_SIZE',
+                         VOLUME_LIST_BATCH_SIZE)
+    client = cinder.cinderclient(request)
+    marker = None
+    while True:
+        volumes = client.volumes.list(search_opts={'all_tenants': True},
+                                      marker=marker, limit=batch_size)
+        if not volumes:
+            break
+        yield [cinder.Volume(v) for v in volumes]
+        if len(volumes) < batch_size:
+            break
+        marker = volumes[-1].id
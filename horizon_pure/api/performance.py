@@ -0,0 +1,130 @@
+# Copyright (c) 2016 Pure Storage, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django.conf import settings
+from django.core.cache import cache
+import logging
+import threading
+import time
+
+from horizon_pure.api import pure_flash_array
+
+
+LOG = logging.getLogger(__name__)
+
+POLL_INTERVAL = 5
+
+# The latest sample of each array is shared through the Django cache, and
+# the lock makes sure only one worker asks the array for it per interval.
+SAMPLE_CACHE_KEY = 'horizon_pure:array_performance:%s'
+SAMPLE_LOCK_KEY = 'horizon_pure:array_performance_lock:%s'
+
+_LOCK = threading.Lock()
+_POLLERS = {}
+
+
+def get_poll_interval():
+    return getattr(settings, 'PURE_PERFORMANCE_POLL_INTERVAL', POLL_INTERVAL)
+
+
+def get_poller(array_id):
+    with _LOCK:
+        poller = _POLLERS.get(array_id)
+        if poller is None:
+            poller = _POLLERS[array_id] = PerformancePoller(array_id)
+        return poller
+
+
+class PerformancePoller(object):
+    """Polls the performance of one array for any number of subscribers.
+
+    The polling thread runs while at least one subscriber is attached.
+    Each new sample bumps a sequence number that subscribers wait on.
+    """
+    def __init__(self, array_id):
+        self.array_id = array_id
+        self._condition = threading.Condition()
+        self._subscribers = 0
+        self._sequence = 0
+        self._sample = None
+        self._thread = None
+
+    def subscribe(self):
+        with self._condition:
+            self._subscribers += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='pure-perf-%s' % self.array_id)
+                self._thread.daemon = True
+                self._thread.start()
+
+    def unsubscribe(self):
+        with self._condition:
+            self._subscribers -= 1
+
+    def wait(self, sequence, timeout):
+        """Waits for a sample newer than ``sequence``.
+
+        Returns the latest sequence number and sample, which are unchanged
+        if nothing new arrived before the timeout.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._sequence != sequence,
+                                     timeout)
+            return self._sequence, self._sample
+
+    def _run(self):
+        array_api = pure_flash_array.FlashArrayAPI()
+        while True:
+            with self._condition:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                sample = self._poll(array_api)
+            except Exception as e:
+                LOG.warning('Failed to poll performance of %s: %s'
+                            % (self.array_id, e))
+                sample = None
+            if sample is not None:
+                with self._condition:
+                    self._sample = sample
+                    self._sequence += 1
+                    self._condition.notify_all()
+            time.sleep(get_poll_interval())
+
+    def _poll(self, array_api):
+        return get_latest_sample(self.array_id, array_api)
+
+
+def get_latest_sample(array_id, array_api):
+    """Returns an array's latest performance sample.
+
+    The array is asked at most once per poll interval across all workers,
+    otherwise the sample in the cache is returned.
+    """
+    interval = get_poll_interval()
+    sample_key = SAMPLE_CACHE_KEY % array_id
+    cached = cache.get(sample_key)
+    if cached and cached['time'] > time.time() - interval:
+        return cached['sample']
+    if not cache.add(SAMPLE_LOCK_KEY % array_id, True, interval):
+        # Another worker is polling this interval, use its last sample
+        return cached['sample'] if cached else None
+
+    sample = array_api.get_array_performance(array_id)
+    cache.set(sample_key, {'time': time.time(), 'sample': sample},
+              interval * 3)
+    return sample
@@ -14,13 +14,20 @@
 #    under the License.
 
 from django.conf import settings
+from django.core.cache import cache
+import heapq
+import itertools
 import logging
 from pypureclient import flasharray
 import re
+import threading
+import time
 
 from openstack_dashboard.api import base
 
 from horizon_pure.api import cinder as pure_cinder_api
+from horizon_pure.api import sharding
+from horizon_pure.api import throttle
 
 
 LOG = logging.getLogger(__name__)
@@ -38,12 +45,110 @@ RATIO_KEYS = [
     'thin_provisioning',
     'total_reduction'
 ]
+STATS_KEYS = [
+    'total_used',
+    'total_available',
+    'total_volume_count',
+    'available_volume_count',
+    'total_snapshot_count',
+    'available_snapshot_count',
+    'total_host_count',
+    'available_host_count',
+    'total_pgroup_count',
+    'available_pgroup_count',
+]
+
+# Cinder names its volumes volume-<id>-cinder, optionally inside a pod
+PURE_VOLUME_NAME_RE = re.compile(r'^(?:.*::)?volume-(?P<volume_id>.+)-cinder$')
+
+# Number of volumes looked up per get_volumes/get_volumes_performance call
+VOLUME_BATCH_SIZE = 50
+
+# Page size used when listing every object of a kind on an array
+ARRAY_LIST_PAGE_SIZE = 1000
+
+# Number of snapshot sources shown in the snapshot analysis
+SNAPSHOT_TOP_COUNT = 25
+
+USER_AGENT = 'OpenStack-Horizon-Pure-UI/2.0.0'
+
+# Volume performance history, keyed by volume id, window and resolution.
+VOLUME_HISTORY_CACHE_KEY = 'horizon_pure:volume_history:%s:%d:%d'
+
+# Alert feed of each array and the newest update time it has seen
+ALERT_FEED_CACHE_KEY = 'horizon_pure:alert_feed:%s'
+ALERT_FEED_LOCK_KEY = 'horizon_pure:alert_feed_lock:%s'
+ALERT_FEED_SIZE = 100
+
+# Logged in clients are kept for the lifetime of the worker process, keyed by
+# backend name, so the api token to session login happens once per worker
+# instead of once per request.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
 
 
 def adjust_purity_size(bytes):
     return bytes / (1024 ** 2)
 
 
+def get_cinder_volume_id(pure_vol_name):
+    match = PURE_VOLUME_NAME_RE.match(pure_vol_name)
+    return match.group('volume_id') if match else None
+
+
+def get_volume_stats(volume, perf=None):
+    """Builds the stats dict of a Purity volume and its performance."""
+    space = volume.space
+    space_stats = {
+        'total': space.total_provisioned if space else 0,
+        'snapshots': space.snapshots if space else 0,
+        'volumes': space.total_physical if space else 0,
+        'data_reduction': space.data_reduction if space else 1.0,
+        'thin_provisioning': space.thin_provisioning if space else 1.0,
+        'total_reduction': space.total_reduction if space else 1.0,
+    }
+
+    perf_stats = {}
+    if perf is not None:
+        perf_stats = {
+            'reads_per_sec': perf.reads_per_sec if perf.reads_per_sec else 0,
+            'writes_per_sec': perf.writes_per_sec if perf.writes_per_sec else 0,
+            'usec_per_read_op': perf.usec_per_read_op if perf.usec_per_read_op else 0,
+            'usec_per_write_op': perf.usec_per_write_op if perf.usec_per_write_op else 0,
+        }
+
+    LOG.debug('raw_stats = %s' % space_stats)
+    stats = space_stats.copy()
+    stats.update(perf_stats)
+    stats.update({
+        'total': adjust_purity_size(space_stats['total']),
+        'output_per_sec': adjust_purity_size(perf_stats.get('reads_per_sec', 0)),
+        'input_per_sec': adjust_purity_size(perf_stats.get('writes_per_sec', 0)),
+    })
+    return stats
+
+
+def list_all_items(list_objects, **kwargs):
+    """Yields every item of an array listing, one page at a time.
+
+    The client stops at ``limit`` items rather than fetching more pages,
+    so the pages of ARRAY_LIST_PAGE_SIZE items are walked explicitly with
+    the continuation token, holding only one page at a time.
+    """
+    continuation_token = None
+    while True:
+        if continuation_token:
+            kwargs['continuation_token'] = continuation_token
+        response = list_objects(limit=ARRAY_LIST_PAGE_SIZE, **kwargs)
+        if response.status_code != 200:
+            raise Exception(f"Failed to list items: {response.errors}")
+        for item in response.items:
+            yield item
+        continuation_token = getattr(response, 'continuation_token', None)
+        if not continuation_token:
+            return
+
+
 class ErrorStateArray(object):
     """Represents an array in error state"""
     def __init__(self, target, e):
@@ -58,34 +163,52 @@ class FlashArrayAPI(object):
         self._array_config = getattr(settings, 'PURE_FLASH_ARRAYS')
         self._array_id_list = []
         self._init_all_arrays()
+        if sharding.is_enabled():
+            sharding.start_collector(type(self))
 
     def _init_all_arrays(self):
+        # Clients are created lazily in _get_array so that a freshly started
+        # worker does not log in to every array before it serves anything.
         for array_conf in self._array_config:
             array_id = array_conf['backend_name']
-            array = self._get_array_from_conf(array_conf)
-            self._arrays[array_id] = array
+            self._arrays[array_id] = _CLIENTS.get(array_id)
             self._array_id_list.append(array_id)
 
     def _get_array_from_conf(self, conf):
-        try:
-            # Create py-pure-client FlashArray client
-            # Note: verify_ssl=False is used because FlashArrays often use self-signed certificates
-            client = flasharray.Client(
-                target=conf['san_ip'],
-                api_token=conf['api_token'],
-                user_agent='OpenStack-Horizon-Pure-UI/2.0.0',
-                verify_ssl=False
-            )
-            # Add custom attributes for compatibility
-            client.error = None
-            client._target = conf['san_ip']
-            client.target = conf['san_ip']
+        array_id = conf['backend_name']
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(array_id)
+        if client is not None:
             return client
+
+        try:
+            client = self._connect(conf)
         except Exception as e:
             LOG.warning('Unable to create Pure Storage FlashArray client: %s'
                         % str(e))
             return ErrorStateArray(conf['san_ip'], 'Failed to connect')
 
+        with _CLIENTS_LOCK:
+            # Another thread may have logged in while we did, keep theirs.
+            return _CLIENTS.setdefault(array_id, client)
+
+    def _connect(self, conf):
+        # Create py-pure-client FlashArray client
+        # Note: verify_ssl=False is used because FlashArrays often use
+        # self-signed certificates
+        client = flasharray.Client(
+            target=conf['san_ip'],
+            api_token=conf['api_token'],
+            user_agent=USER_AGENT,
+            verify_ssl=False
+        )
+
+        # Add custom attributes for compatibility
+        client.error = None
+        client._target = conf['san_ip']
+        client.target = conf['san_ip']
+        return throttle.ThrottledClient(client, conf['backend_name'])
+
     def _get_capacity_limits(self, model, version):
         """
         Get capacity limits based on array model and Purity version.
@@ -204,64 +327,85 @@ class FlashArrayAPI(object):
         return array
 
     def get_volumes_data(self, volumes):
+        stats = self.get_volumes_stats(volumes)
         data = []
         for vol in volumes:
-            data.append(self.get_volume_info(vol))
+            data.append(self._make_pure_volume(vol, stats.get(vol.id, {})))
         return data
 
-    def _get_volume_stats(self, client, vol_id):
-        pure_vol_name = 'volume-%s-cinder' % vol_id
-        LOG.debug('Getting volume stats for %s from %s' % (vol_id, client.target))
+    def get_volumes_stats(self, volumes):
+        """Returns the Purity stats of many volumes, keyed by volume id.
 
+        Volumes are grouped by backend and looked up in batches, so the
+        number of REST calls depends on the number of backends and batches
+        rather than on the number of volumes. Volumes without a known
+        backend are looked for on every configured array.
+        """
+        by_backend = {}
+        unknown = []
+        for vol in volumes:
+            backend = self.get_volume_backend(vol)
+            if not backend:
+                unknown.append(vol.id)
+            elif backend in self._array_id_list:
+                by_backend.setdefault(backend, []).append(vol.id)
+
+        stats = {}
+        for array_id, vol_ids in by_backend.items():
+            stats.update(self._get_array_volumes_stats(array_id, vol_ids))
+        for array_id in self._array_id_list:
+            if not unknown:
+                break
+            found = self._get_array_volumes_stats(array_id, unknown)
+            stats.update(found)
+            unknown = [vol_id for vol_id in unknown if vol_id not in found]
+        return stats
+
+    def _get_array_volumes_stats(self, array_id, vol_ids):
+        array = self._get_array(array_id)
+        if hasattr(array, 'error') and array.error:
+            return {}
         try:
-            # Try to get volume with space stats
-            response = client.get_volumes(names=[pure_vol_name])
-            if response.status_code != 200 or not list(response.items):
-                # Try with pod prefix
-                pure_vol_name = "*::" + pure_vol_name
-                response = client.get_volumes(names=[pure_vol_name])
+            return self._get_volumes_stats_batch(array, vol_ids)
+        except Exception as e:
+            LOG.warning('Failed to get Purity volume info from %s: %s'
+                        % (array_id, e))
+            return {}
 
+    def _get_volumes_stats_batch(self, client, vol_ids):
+        LOG.debug('Getting stats for %d volumes from %s'
+                  % (len(vol_ids), client.target))
+        stats = {}
+        for i in range(0, len(vol_ids), VOLUME_BATCH_SIZE):
+            # The leading wildcard also matches volumes inside pods
+            name_filter = ' or '.join(
+                "name='*volume-%s-cinder'" % vol_id
+                for vol_id in vol_ids[i:i + VOLUME_BATCH_SIZE])
+            response = client.get_volumes(filter=name_filter,
+                                          destroyed=False)
             if response.status_code != 200:
-                raise Exception(f"Failed to get volume: {response.errors}")
-
-            volume = list(response.items)[0]
-            space_stats = {
-                'total': volume.space.total_provisioned if volume.space else 0,
-                'snapshots': volume.space.snapshots if volume.space else 0,
-                'volumes': volume.space.total_physical if volume.space else 0,
-                'data_reduction': volume.space.data_reduction if volume.space else 1.0,
-                'thin_provisioning': volume.space.thin_provisioning if volume.space else 1.0,
-                'total_reduction': volume.space.total_reduction if volume.space else 1.0,
-            }
-
-            # Get performance stats
-            perf_response = client.get_volumes_performance(names=[pure_vol_name])
-            perf_stats = {}
+                raise Exception(f"Failed to get volumes: {response.errors}")
+
+            volumes = {}
+            for volume in response.items:
+                vol_id = get_cinder_volume_id(volume.name)
+                if vol_id:
+                    volumes[volume.name] = (vol_id, volume)
+            if not volumes:
+                continue
+
+            perfs = {}
+            perf_response = client.get_volumes_performance(
+                names=list(volumes))
             if perf_response.status_code == 200:
-                perf = list(perf_response.items)[0]
-                perf_stats = {
-                    'reads_per_sec': perf.reads_per_sec if perf.reads_per_sec else 0,
-                    'writes_per_sec': perf.writes_per_sec if perf.writes_per_sec else 0,
-                    'usec_per_read_op': perf.usec_per_read_op if perf.usec_per_read_op else 0,
-                    'usec_per_write_op': perf.usec_per_write_op if perf.usec_per_write_op else 0,
-                }
+                perfs = dict((perf.name, perf)
+                             for perf in perf_response.items)
 
-            LOG.debug('raw_stats = %s' % space_stats)
-            stats = space_stats.copy()
-            stats.update(perf_stats)
-            stats.update({
-                'total': adjust_purity_size(space_stats['total']),
-                'output_per_sec': adjust_purity_size(perf_stats.get('reads_per_sec', 0)),
-                'input_per_sec': adjust_purity_size(perf_stats.get('writes_per_sec', 0)),
-            })
-            LOG.debug('stats = %s' % stats)
-            return stats
-        except Exception as e:
-            LOG.error(f"Error getting volume stats: {e}")
-            raise
+            for name, (vol_id, volume) in volumes.items():
+                stats[vol_id] = get_volume_stats(volume, perfs.get(name))
+        return stats
 
-    def get_volume_info(self, volume):
-        stats = {}
+    def get_volume_backend(self, volume):
         try:
             backend = getattr(volume, 'os-vol-host-attr:host')
             backend = re.split('@', backend)[1]
@@ -270,32 +414,322 @@ class FlashArrayAPI(object):
         except Exception:
             backend = ''
             LOG.debug('Backend not found. Looping...')
-        if backend:
-            # Fast path, we are an admin and know what array it belongs to
-            array = self._get_array(backend)
-            LOG.debug('Got array %s' % array)
-            if array and not (hasattr(array, 'error') and array.error):
-                try:
-                    stats = self._get_volume_stats(array, volume.id)
-                except Exception as e:
-                    LOG.exception(e)
-                    LOG.warning('Failed to get Purity volume info: %s' % e)
+        return backend
+
+    def _make_pure_volume(self, volume, stats):
+        return pure_cinder_api.PureVolume(
+            volume, pure_cinder_api.PureVolumeStats(stats))
+
+    def _get_volume_history(self, client, vol_id, start_time, end_time,
+                            resolution):
+        pure_vol_name = 'volume-%s-cinder' % vol_id
+        LOG.debug('Getting volume performance history for %s from %s'
+                  % (vol_id, client.target))
+        history_args = {
+            'start_time': start_time,
+            'end_time': end_time,
+            'resolution': resolution,
+        }
+
+        response = client.get_volumes_performance(names=[pure_vol_name],
+                                                  **history_args)
+        if response.status_code != 200:
+            # Try with pod prefix
+            pure_vol_name = "*::" + pure_vol_name
+            response = client.get_volumes_performance(names=[pure_vol_name],
+                                                      **history_args)
+        if response.status_code != 200:
+            raise Exception(f"Failed to get volume performance: "
+                            f"{response.errors}")
+
+        series = []
+        for perf in response.items:
+            series.append([
+                perf.time,
+                perf.reads_per_sec or 0,
+                perf.writes_per_sec or 0,
+                perf.usec_per_read_op or 0,
+                perf.usec_per_write_op or 0,
+            ])
+        series.sort()
+        return series
+
+    def get_volume_performance_history(self, volume, window, resolution):
+        """Returns the performance series of a volume for the last window.
+
+        Both ``window`` and ``resolution`` are in milliseconds. The series is
+        cached per volume and resolution. Later calls only ask the array for
+        the samples newer than the cached ones, and samples that fell out of
+        the window are dropped.
+
+        Each sample is a list of ``[time, reads_per_sec, writes_per_sec,
+        usec_per_read_op, usec_per_write_op]``.
+        """
+        cache_key = VOLUME_HISTORY_CACHE_KEY % (volume.id, window, resolution)
+        # Align to the resolution so every worker asks for the same samples
+        end_time = int(time.time() * 1000) // resolution * resolution
+        start_time = end_time - window
+
+        entry = cache.get(cache_key)
+        if entry and entry['end_time'] >= end_time:
+            return entry['series']
+
+        series = []
+        fetch_from = start_time
+        if entry:
+            series = [s for s in entry['series'] if s[0] >= start_time]
+            fetch_from = max(start_time, entry['end_time'])
+            backends = [entry['backend']]
         else:
-            for array_id in self._array_id_list:
-                array = self._get_array(array_id)
-                LOG.debug('Trying array %s' % array)
-                try:
-                    stats = self._get_volume_stats(array, volume.id)
-                    break
-                except Exception as e:
-                    LOG.debug('Unable to get volume stats from %s for vol %s:'
-                              ' %s' % (array_id, volume.id, e))
-            if not stats:
-                LOG.debug('Failed to find volume %s on any configured arrays!'
-                          % volume.id)
-
-        stats.update(volume.to_dict())
-        return pure_cinder_api.PureVolume(base.APIDictWrapper(stats))
+            backend = self.get_volume_backend(volume)
+            backends = [backend] if backend else self._array_id_list
+
+        for array_id in backends:
+            array = self._get_array(array_id)
+            if hasattr(array, 'error') and array.error:
+                continue
+            try:
+                newer = self._get_volume_history(array, volume.id,
+                                                 fetch_from, end_time,
+                                                 resolution)
+            except Exception as e:
+                LOG.debug('Unable to get volume history from %s for vol %s:'
+                          ' %s' % (array_id, volume.id, e))
+                continue
+            last_time = series[-1][0] if series else -1
+            series.extend(s for s in newer if s[0] > last_time)
+            cache.set(cache_key,
+                      {'backend': array_id,
+                       'end_time': end_time,
+                       'series': series},
+                      window // 1000)
+            return series
+
+        LOG.debug('Failed to find volume %s history on any configured arrays!'
+                  % volume.id)
+        if entry:
+            # The volume may have moved, look it up again next time
+            cache.delete(cache_key)
+        return series
+
+    def get_project_usage(self, volume_projects):
+        """Rolls Purity volume space up by the project owning each volume.
+
+        ``volume_projects`` maps Cinder volume ids to project ids. Every
+        array's volumes are listed once in pages of ARRAY_LIST_PAGE_SIZE and
+        joined by volume id, so the cost does not depend on the number of
+        projects.
+        """
+        usage = {}
+        for array_id in self._array_id_list:
+            array = self._get_array(array_id)
+            if hasattr(array, 'error') and array.error:
+                continue
+            try:
+                for volume in list_all_items(array.get_volumes,
+                                             destroyed=False):
+                    project_id = volume_projects.get(
+                        get_cinder_volume_id(volume.name))
+                    if project_id is None:
+                        continue
+                    project = usage.setdefault(project_id, {
+                        'volume_count': 0,
+                        'provisioned': 0,
+                        'physical': 0,
+                        'snapshots': 0,
+                    })
+                    project['volume_count'] += 1
+                    # Unset attributes may raise instead of returning None
+                    space = getattr(volume, 'space', None)
+                    if space:
+                        project['provisioned'] += \
+                            getattr(space, 'total_provisioned', 0) or 0
+                        project['physical'] += \
+                            getattr(space, 'total_physical', 0) or 0
+                        project['snapshots'] += \
+                            getattr(space, 'snapshots', 0) or 0
+            except Exception as e:
+                LOG.warning('Failed to get project usage from %s: %s'
+                            % (array_id, e))
+
+        for project in usage.values():
+            for key in ('provisioned', 'physical', 'snapshots'):
+                project[key] = adjust_purity_size(project[key])
+        return usage
+
+    def _get_snapshot_limit(self, array):
+        controller_response = array.get_controllers()
+        if controller_response.status_code != 200:
+            return 0
+        controller = list(controller_response.items)[0]
+        return self._get_capacity_limits(controller.model,
+                                         controller.version)[1]
+
+    def get_snapshot_sources(self, top_count=SNAPSHOT_TOP_COUNT):
+        """Finds the volumes and protection groups with the most snapshots.
+
+        Every array's snapshots are listed once in pages of
+        ARRAY_LIST_PAGE_SIZE and counted into a small counter per source,
+        holding the snapshot count, space used and oldest creation time.
+        Snapshots taken by a protection group count toward both the group
+        and the volume.
+        """
+        now = time.time() * 1000
+        sources = []
+        for array_id in self._array_id_list:
+            array = self._get_array(array_id)
+            if hasattr(array, 'error') and array.error:
+                continue
+            counters = {}
+            try:
+                snapshot_limit = self._get_snapshot_limit(array)
+                for snap in list_all_items(array.get_volume_snapshots,
+                                           destroyed=False):
+                    # Unset attributes may raise instead of returning None
+                    space = getattr(snap, 'space', None)
+                    source = getattr(snap, 'source', None)
+                    size = 0
+                    if space:
+                        size = (getattr(space, 'total_physical', 0) or
+                                getattr(space, 'unique', 0) or 0)
+                    created = getattr(snap, 'created', None) or now
+                    if source:
+                        volume_name = source.name
+                    else:
+                        volume_name = snap.name.rsplit('.', 1)[0]
+                    keys = [('volume', volume_name)]
+                    # Protection group snapshots are named pgroup.suffix.volume
+                    name_parts = snap.name.split('.')
+                    if len(name_parts) > 2:
+                        keys.append(('pgroup', name_parts[0]))
+                    for key in keys:
+                        counter = counters.get(key)
+                        if counter is None:
+                            counters[key] = [1, size, created]
+                        else:
+                            counter[0] += 1
+                            counter[1] += size
+                            counter[2] = min(counter[2], created)
+            except Exception as e:
+                LOG.warning('Failed to get snapshots from %s: %s'
+                            % (array_id, e))
+                continue
+
+            for (kind, name), (count, size, oldest) in counters.items():
+                sources.append({
+                    'id': '%s:%s:%s' % (array_id, kind, name),
+                    'backend': array_id,
+                    'kind': kind,
+                    'name': name,
+                    'cinder_id': (get_cinder_volume_id(name)
+                                  if kind == 'volume' else None),
+                    'snapshot_count': count,
+                    'snapshot_limit': snapshot_limit,
+                    'limit_used': (100.0 * count / snapshot_limit
+                                   if snapshot_limit else 0),
+                    'space': adjust_purity_size(size),
+                    'oldest_age': (now - oldest) / (24 * 60 * 60 * 1000),
+                })
+
+        return heapq.nlargest(top_count, sources,
+                              key=lambda source: source['snapshot_count'])
+
+    def _get_alert_feed(self, array_id):
+        feed_key = ALERT_FEED_CACHE_KEY % array_id
+        feed = cache.get(feed_key) or {'watermark': None, 'alerts': []}
+
+        # Only one worker at a time asks the array for newer alerts, the
+        # others use the feed as it is.
+        if not cache.add(ALERT_FEED_LOCK_KEY % array_id, True, 30):
+            return feed['alerts']
+        try:
+            array = self._get_array(array_id)
+            if hasattr(array, 'error') and array.error:
+                return feed['alerts']
+
+            query = {'sort': 'updated-', 'limit': ALERT_FEED_SIZE}
+            if feed['watermark'] is not None:
+                query['filter'] = 'updated>%d' % feed['watermark']
+            response = array.get_alerts(**query)
+            if response.status_code != 200:
+                raise Exception(f"Failed to get alerts: {response.errors}")
+
+            # Stop at one page, the item iterator would fetch the rest
+            newer = {}
+            for alert in itertools.islice(response.items, ALERT_FEED_SIZE):
+                alert_id = '%s:%s' % (array_id, alert.id)
+                newer[alert_id] = {
+                    'id': alert_id,
+                    'backend': array_id,
+                    'name': getattr(alert, 'name', None),
+                    'code': getattr(alert, 'code', None),
+                    'severity': getattr(alert, 'severity', None),
+                    'state': getattr(alert, 'state', None),
+                    'component_name': getattr(alert, 'component_name', None),
+                    'summary': getattr(alert, 'summary', None),
+                    'created': getattr(alert, 'created', None),
+                    'updated': getattr(alert, 'updated', None),
+                }
+            if newer:
+                LOG.debug('Found %d new or updated alerts on %s'
+                          % (len(newer), array_id))
+                alerts = list(newer.values())
+                alerts.extend(a for a in feed['alerts']
+                              if a['id'] not in newer)
+                alerts.sort(key=lambda a: a['updated'] or 0, reverse=True)
+                feed = {
+                    'watermark': max(a['updated'] or 0 for a in alerts),
+                    'alerts': alerts[:ALERT_FEED_SIZE],
+                }
+                cache.set(feed_key, feed, None)
+            return feed['alerts']
+        except Exception as e:
+            LOG.warning('Failed to get alerts from %s: %s' % (array_id, e))
+            return feed['alerts']
+        finally:
+            cache.delete(ALERT_FEED_LOCK_KEY % array_id)
+
+    def get_alerts(self):
+        """Returns the latest alerts of all arrays, newest first.
+
+        Each array's feed remembers the newest alert update time it has
+        seen, and only alerts updated after it are asked for. The feed is
+        kept to the ALERT_FEED_SIZE latest alerts of the array, so polling
+        costs the same however much alert history the array keeps.
+        """
+        alerts = []
+        for array_id in self._array_id_list:
+            alerts.extend(self._get_alert_feed(array_id))
+        alerts.sort(key=lambda a: a['updated'] or 0, reverse=True)
+        return alerts
+
+    def get_object_names(self, array_id):
+        """Returns the volume, host and protection group names of an array.
+
+        Each kind is listed once in pages of ARRAY_LIST_PAGE_SIZE. Returns
+        None if the array cannot be listed, so callers can keep what they
+        already know about it.
+        """
+        array = self._get_array(array_id)
+        if hasattr(array, 'error') and array.error:
+            return None
+        listings = (
+            ('volume', array.get_volumes, {'destroyed': False}),
+            ('host', array.get_hosts, {}),
+            ('pgroup', array.get_protection_groups, {'destroyed': False}),
+        )
+        names = {}
+        try:
+            for kind, list_objects, kwargs in listings:
+                names[kind] = set(item.name for item
+                                  in list_all_items(list_objects, **kwargs))
+        except Exception as e:
+            LOG.warning('Failed to list object names of %s: %s'
+                        % (array_id, e))
+            return None
+        LOG.debug('Listed %d object names on %s'
+                  % (sum(len(n) for n in names.values()), array_id))
+        return names
 
     def get_host_stats(self, host):
         # TODO: Lookup the purity host and return perf info and connected volumes
@@ -317,6 +751,12 @@ class FlashArrayAPI(object):
         return stats
 
     def get_array_stats(self, array_id):
+        info = sharding.get_published_info(array_id)
+        if info is not None:
+            return dict((key, info.get(key, 0)) for key in STATS_KEYS)
+        return self._get_array_stats(array_id)
+
+    def _get_array_stats(self, array_id, space_response=None):
         array = self._get_array(array_id)
 
         total_used = 0
@@ -349,28 +789,30 @@ class FlashArrayAPI(object):
                 available_host_count += array_host_cap
                 available_pgroup_count += array_pgroup_cap
 
-                # Get volume counts using total_item_count
-                vol_response = array.get_volumes(total_item_count=True)
+                # Get volume counts using total_item_count, a single item is
+                # enough as only the count is used
+                vol_response = array.get_volumes(total_item_count=True, limit=1)
                 if vol_response.status_code == 200 and vol_response.total_item_count is not None:
                     total_volume_count += vol_response.total_item_count
 
                 # Get snapshot counts using total_item_count
-                snap_response = array.get_volume_snapshots(total_item_count=True)
+                snap_response = array.get_volume_snapshots(total_item_count=True, limit=1)
                 if snap_response.status_code == 200 and snap_response.total_item_count is not None:
                     total_snapshot_count += snap_response.total_item_count
 
                 # Get host counts using total_item_count
-                host_response = array.get_hosts(total_item_count=True)
+                host_response = array.get_hosts(total_item_count=True, limit=1)
                 if host_response.status_code == 200 and host_response.total_item_count is not None:
                     total_host_count += host_response.total_item_count
 
                 # Get protection group counts using total_item_count
-                pgroup_response = array.get_protection_groups(total_item_count=True)
+                pgroup_response = array.get_protection_groups(total_item_count=True, limit=1)
                 if pgroup_response.status_code == 200 and pgroup_response.total_item_count is not None:
                     total_pgroup_count += pgroup_response.total_item_count
 
-                # Get space info
-                space_response = array.get_arrays_space()
+                # Get space info, unless the caller already has it
+                if space_response is None:
+                    space_response = array.get_arrays_space()
                 if space_response.status_code == 200:
                     space_info = list(space_response.items)[0]
                     total_used = total_used + space_info.space.total_physical
@@ -393,10 +835,37 @@ class FlashArrayAPI(object):
         }
         return stats
 
+    def _get_array_performance(self, array):
+        perf_info = {}
+        perf_response = array.get_arrays_performance()
+        if perf_response.status_code == 200:
+            perf_obj = list(perf_response.items)[0]
+            perf_info = {
+                'queue_depth': perf_obj.queue_depth if hasattr(perf_obj, 'queue_depth') and perf_obj.queue_depth else 0,
+                'reads_per_sec': perf_obj.reads_per_sec if hasattr(perf_obj, 'reads_per_sec') and perf_obj.reads_per_sec else 0,
+                'writes_per_sec': perf_obj.writes_per_sec if hasattr(perf_obj, 'writes_per_sec') and perf_obj.writes_per_sec else 0,
+                'usec_per_read_op': perf_obj.usec_per_read_op if hasattr(perf_obj, 'usec_per_read_op') and perf_obj.usec_per_read_op else 0,
+                'usec_per_write_op': perf_obj.usec_per_write_op if hasattr(perf_obj, 'usec_per_write_op') and perf_obj.usec_per_write_op else 0,
+            }
+        return perf_info
+
+    def get_array_performance(self, array_id):
+        array = self._get_array(array_id)
+        if hasattr(array, 'error') and array.error:
+            return {}
+        return self._get_array_performance(array)
+
     def get_array_list(self):
         return self._array_id_list
 
     def get_array_info(self, array_id, detailed=False):
+        info = sharding.get_published_info(array_id)
+        if info is None:
+            info = self.collect_array_info(array_id, detailed)
+        return base.APIDictWrapper(info)
+
+    def collect_array_info(self, array_id, detailed=True):
+        """Queries the array for its info, ignoring any published copy."""
         array = self._get_array(array_id)
         if hasattr(array, 'error') and array.error:
             info = {
@@ -440,7 +909,7 @@ class FlashArrayAPI(object):
                 info['cinder_name'] = array_id
                 info['cinder_id'] = array_id
                 info['target'] = array._target if hasattr(array, '_target') else array.target
-                return base.APIDictWrapper(info)
+                return info
 
             if response.status_code != 200:
                 LOG.warning('get_arrays() returned status %d for %s' % (response.status_code, array_id))
@@ -522,19 +991,9 @@ class FlashArrayAPI(object):
 
                 if detailed:
                     # Get performance info
-                    perf_response = array.get_arrays_performance()
-                    if perf_response.status_code == 200:
-                        perf_obj = list(perf_response.items)[0]
-                        perf_info = {
-                            'queue_depth': perf_obj.queue_depth if hasattr(perf_obj, 'queue_depth') and perf_obj.queue_depth else 0,
-                            'reads_per_sec': perf_obj.reads_per_sec if hasattr(perf_obj, 'reads_per_sec') and perf_obj.reads_per_sec else 0,
-                            'writes_per_sec': perf_obj.writes_per_sec if hasattr(perf_obj, 'writes_per_sec') and perf_obj.writes_per_sec else 0,
-                            'usec_per_read_op': perf_obj.usec_per_read_op if hasattr(perf_obj, 'usec_per_read_op') and perf_obj.usec_per_read_op else 0,
-                            'usec_per_write_op': perf_obj.usec_per_write_op if hasattr(perf_obj, 'usec_per_write_op') and perf_obj.usec_per_write_op else 0,
-                        }
-                        info.update(perf_info)
-
-                stats = self.get_array_stats(array_id)
+                    info.update(self._get_array_performance(array))
+
+                stats = self._get_array_stats(array_id, space_response)
                 info.update(stats)
 
         info['cinder_name'] = array_id
@@ -548,4 +1007,4 @@ class FlashArrayAPI(object):
                 info[key] = "%.2f to 1" % info[key]
 
         LOG.debug('Found flash array info for %s: %s' % (array_id, str(info)))
-        return base.APIDictWrapper(info)
+        return info
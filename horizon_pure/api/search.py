@@ -0,0 +1,193 @@
+# Copyright (c) 2016 Pure Storage, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import bisect
+from django.conf import settings
+import logging
+import threading
+import time
+
+
+LOG = logging.getLogger(__name__)
+
+REFRESH_INTERVAL = 300
+SEARCH_LIMIT = 50
+
+# Above this many changes the sorted prefix list is rebuilt in one go
+# instead of inserting and deleting one entry at a time.
+_REBUILD_THRESHOLD = 100
+
+
+def get_refresh_interval():
+    return getattr(settings, 'PURE_SEARCH_REFRESH_INTERVAL', REFRESH_INTERVAL)
+
+
+def _trigrams(name):
+    return set(name[i:i + 3] for i in range(len(name) - 2))
+
+
+class NameIndex(object):
+    """In-memory index of FlashArray object names.
+
+    Queries shorter than three characters are prefix lookups in a sorted
+    list, longer ones intersect the entries of each of their trigrams.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._ids = {}
+        self._names = {}
+        self._trigrams = {}
+        self._prefixes = []
+        self._next_id = 0
+        self.refreshed_at = None
+
+    def update(self, array_id, kind, names):
+        """Makes the index hold exactly ``names`` for one kind of object of
+        one array, only touching the names that were added or removed.
+        """
+        with self._lock:
+            current = self._names.setdefault((array_id, kind), set())
+            removed = current - names
+            added = names - current
+            rebuild = len(removed) + len(added) > _REBUILD_THRESHOLD
+
+            for name in removed:
+                entry_id = self._ids.pop((array_id, kind, name))
+                lower = self._entries.pop(entry_id)[0]
+                for trigram in _trigrams(lower):
+                    ids = self._trigrams[trigram]
+                    ids.discard(entry_id)
+                    if not ids:
+                        del self._trigrams[trigram]
+                if not rebuild:
+                    index = bisect.bisect_left(self._prefixes,
+                                               (lower, entry_id))
+                    del self._prefixes[index]
+
+            for name in added:
+                entry_id = self._next_id
+                self._next_id += 1
+                lower = name.lower()
+                self._entries[entry_id] = (lower, name, kind, array_id)
+                self._ids[(array_id, kind, name)] = entry_id
+                for trigram in _trigrams(lower):
+                    self._trigrams.setdefault(trigram, set()).add(entry_id)
+                if not rebuild:
+                    bisect.insort(self._prefixes, (lower, entry_id))
+
+            if rebuild:
+                self._prefixes = sorted(
+                    (entry[0], entry_id)
+                    for entry_id, entry in self._entries.items())
+            current -= removed
+            current |= added
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """Returns up to ``limit`` (name, kind, array_id) tuples matching
+        the query, names starting with it first.
+        """
+        query = query.strip().lower()
+        if not query:
+            return []
+
+        with self._lock:
+            if len(query) < 3:
+                matches = []
+                index = bisect.bisect_left(self._prefixes, (query,))
+                for lower, entry_id in self._prefixes[index:index + limit]:
+                    if not lower.startswith(query):
+                        break
+                    matches.append(self._entries[entry_id])
+            else:
+                candidates = sorted((self._trigrams.get(trigram, set())
+                                     for trigram in _trigrams(query)),
+                                    key=len)
+                ids = candidates[0].intersection(*candidates[1:])
+                matches = [self._entries[entry_id] for entry_id in ids]
+                matches = [entry for entry in matches if query in entry[0]]
+
+        matches.sort(key=lambda entry: (not entry[0].startswith(query),
+                                        entry[0]))
+        return [entry[1:] for entry in matches[:limit]]
+
+
+_INDEX = NameIndex()
+_REFRESH_LOCK = threading.Lock()
+_STATE_LOCK = threading.Lock()
+_REFRESHING = False
+
+
+def refresh(array_api):
+    """Lists every array's object names and updates the index with them.
+
+    An array that cannot be reached keeps the names it had.
+    """
+    with _REFRESH_LOCK:
+        for array_id in array_api.get_array_list():
+            names = array_api.get_object_names(array_id)
+            if names is None:
+                continue
+            for kind, kind_names in names.items():
+                _INDEX.update(array_id, kind, kind_names)
+        _INDEX.refreshed_at = time.time()
+
+
+def _refresh_in_background(array_api_class):
+    global _REFRESHING
+    try:
+        refresh(array_api_class())
+    except Exception as e:
+        LOG.exception('Failed to refresh the FlashArray name index: %s' % e)
+    finally:
+        with _STATE_LOCK:
+            _REFRESHING = False
+
+
+def _start_refresh(array_api_class):
+    """Starts a background refresh, unless one is already running."""
+    global _REFRESHING
+    with _STATE_LOCK:
+        if _REFRESHING:
+            return
+        _REFRESHING = True
+    thread = threading.Thread(target=_refresh_in_background,
+                              args=(array_api_class,),
+                              name='pure-name-index')
+    thread.daemon = True
+    thread.start()
+
+
+def start_warmup(array_api_class):
+    """Starts building this process' index, if it is not built yet."""
+    if _INDEX.refreshed_at is None:
+        _start_refresh(array_api_class)
+
+
+def get_index(array_api):
+    """Returns the name index of this process, or None while it is built.
+
+    Searches never wait on the arrays. The index is built in the background
+    from the first panel request, and refreshed in the background once it
+    is older than PURE_SEARCH_REFRESH_INTERVAL seconds. Each worker process
+    keeps its own index, so every process that serves the panel lists the
+    whole fleet once per interval.
+    """
+    if _INDEX.refreshed_at is None:
+        _start_refresh(type(array_api))
+        return None
+    if _INDEX.refreshed_at < time.time() - get_refresh_interval():
+        _start_refresh(type(array_api))
+    return _INDEX
@@ -0,0 +1,138 @@
+# Copyright (c) 2016 Pure Storage, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django.conf import settings
+from django.core.cache import cache
+import hashlib
+import logging
+import socket
+import threading
+import time
+
+
+LOG = logging.getLogger(__name__)
+
+POLL_INTERVAL = 60
+
+# Live nodes announce themselves in the shared cache and split the arrays
+# between them by backend name. Each node polls and publishes only the
+# arrays it owns, and reads the others from the cache.
+NODES_KEY = 'horizon_pure:shard_nodes'
+NODES_LOCK_KEY = 'horizon_pure:shard_nodes_lock'
+COLLECT_LOCK_KEY = 'horizon_pure:shard_collect_lock:%s'
+PUBLISHED_KEY = 'horizon_pure:shard_array_info:%s'
+
+_LOCK = threading.Lock()
+_COLLECTOR = None
+
+
+def is_enabled():
+    return getattr(settings, 'PURE_SHARDED_POLLING', False)
+
+
+def get_node_id():
+    return getattr(settings, 'PURE_NODE_ID', None) or socket.gethostname()
+
+
+def get_poll_interval():
+    return getattr(settings, 'PURE_SHARD_POLL_INTERVAL', POLL_INTERVAL)
+
+
+def get_owner(array_id, nodes):
+    """Returns which of the nodes owns an array.
+
+    Rendezvous hashing only moves the arrays of a node that joins or
+    leaves, every other array keeps its owner.
+    """
+    def weight(node):
+        key = ('%s:%s' % (node, array_id)).encode('utf-8')
+        return hashlib.sha1(key).hexdigest()
+    return max(nodes, key=weight) if nodes else None
+
+
+def heartbeat(node):
+    """Marks the node alive and returns the sorted list of live nodes."""
+    now = time.time()
+    node_timeout = get_poll_interval() * 3
+    for _attempt in range(10):
+        if cache.add(NODES_LOCK_KEY, node, 5):
+            try:
+                nodes = cache.get(NODES_KEY) or {}
+                nodes[node] = now
+                nodes = dict((n, seen) for n, seen in nodes.items()
+                             if seen > now - node_timeout)
+                cache.set(NODES_KEY, nodes, None)
+            finally:
+                cache.delete(NODES_LOCK_KEY)
+            return sorted(nodes)
+        time.sleep(0.1)
+
+    LOG.warning('Unable to update the list of Horizon nodes, using the '
+                'last known one')
+    nodes = cache.get(NODES_KEY) or {}
+    live = set(n for n, seen in nodes.items() if seen > now - node_timeout)
+    live.add(node)
+    return sorted(live)
+
+
+def get_published_info(array_id):
+    """Returns the info another node published for an array, if any."""
+    if not is_enabled():
+        return None
+    published = cache.get(PUBLISHED_KEY % array_id)
+    if published is None:
+        return None
+    return dict(published['info'])
+
+
+def collect_once(array_api):
+    node = get_node_id()
+    nodes = heartbeat(node)
+    interval = get_poll_interval()
+    for array_id in array_api.get_array_list():
+        if get_owner(array_id, nodes) != node:
+            continue
+        # Only one worker process of the node collects each interval
+        if not cache.add(COLLECT_LOCK_KEY % array_id, node,
+                         max(interval - 1, 1)):
+            continue
+        LOG.debug('Collecting info of owned array %s' % array_id)
+        info = array_api.collect_array_info(array_id)
+        cache.set(PUBLISHED_KEY % array_id,
+                  {'node': node, 'time': time.time(), 'info': info},
+                  interval * 3)
+
+
+def _collect_forever(array_api_class):
+    array_api = array_api_class()
+    while True:
+        try:
+            collect_once(array_api)
+        except Exception as e:
+            LOG.exception('Sharded array collection failed: %s' % e)
+        time.sleep(get_poll_interval())
+
+
+def start_collector(array_api_class):
+    """Starts this process' collector thread, if it is not running yet."""
+    global _COLLECTOR
+    with _LOCK:
+        if _COLLECTOR is not None:
+            return
+        _COLLECTOR = threading.Thread(target=_collect_forever,
+                                      args=(array_api_class,),
+                                      name='pure-shard-collector')
+        _COLLECTOR.daemon = True
+        _COLLECTOR.start()
@@ -0,0 +1,128 @@
+# Copyright (c) 2016 Pure Storage, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django.conf import settings
+import functools
+import logging
+import threading
+
+
+LOG = logging.getLogger(__name__)
+
+# Requests the dashboard may have in flight to one array from one worker
+# process. Cinder's driver shares the array's REST capacity with us. The
+# limit is not coordinated between processes, so an array may see up to this
+# many requests per worker process on every Horizon node.
+MAX_CONCURRENT_REQUESTS = 4
+
+_LOCK = threading.Lock()
+_SEMAPHORES = {}
+_FLIGHTS = {}
+
+
+def _get_semaphore(array_id):
+    with _LOCK:
+        semaphore = _SEMAPHORES.get(array_id)
+        if semaphore is None:
+            limit = getattr(settings, 'PURE_MAX_CONCURRENT_REQUESTS',
+                            MAX_CONCURRENT_REQUESTS)
+            semaphore = threading.BoundedSemaphore(limit)
+            _SEMAPHORES[array_id] = semaphore
+        return semaphore
+
+
+class SharedResponse(object):
+    """A client response that can be handed to several callers.
+
+    The client's item iterator can only be consumed once, so its items are
+    read into a list when the response arrives. Listings are requested one
+    page at a time with a limit, so this holds one page, and the list goes
+    away with the response.
+    """
+    def __init__(self, response):
+        self._response = response
+        self._items = None
+        if hasattr(response, 'items'):
+            self._items = list(response.items)
+
+    @property
+    def items(self):
+        if self._items is None:
+            return self._response.items
+        return iter(self._items)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(self._response, attr)
+
+
+class _Flight(object):
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class ThrottledClient(object):
+    """Wraps a FlashArray client to limit and coalesce its requests.
+
+    Every get_* call waits for one of the array's
+    PURE_MAX_CONCURRENT_REQUESTS slots, and keeps it until all of its items
+    are read. A call made while an identical call to the same array is in
+    flight does not go to the array, it waits for and shares that result.
+    """
+    def __init__(self, client, array_id):
+        self._client = client
+        self._array_id = array_id
+        self._semaphore = _get_semaphore(array_id)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        value = getattr(self._client, attr)
+        if attr.startswith('get_') and callable(value):
+            return functools.partial(self._call, attr, value)
+        return value
+
+    def _call(self, name, method, *args, **kwargs):
+        key = repr((self._array_id, name, args, sorted(kwargs.items())))
+        with _LOCK:
+            flight = _FLIGHTS.get(key)
+            leader = flight is None
+            if leader:
+                flight = _FLIGHTS[key] = _Flight()
+
+        if not leader:
+            LOG.debug('Sharing in flight %s call to %s'
+                      % (name, self._array_id))
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.response
+
+        try:
+            # Reading the items may fetch further pages of a call without
+            # a limit, so it is done while holding the slot.
+            with self._semaphore:
+                flight.response = SharedResponse(method(*args, **kwargs))
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with _LOCK:
+                del _FLIGHTS[key]
+            flight.done.set()
+        return flight.response
@@ -13,16 +13,29 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import functools
 import logging
 
+from django.template.defaultfilters import floatformat
+from django.urls import re_path
 from django.utils.translation import gettext_lazy as _
 from horizon import tables
+from horizon.templatetags import sizeformat
+from openstack_dashboard.dashboards.admin.volumes import tables \
+    as admin_volumes_tables
+from openstack_dashboard.dashboards.admin.volumes import views \
+    as admin_volumes_views
+from openstack_dashboard.dashboards.project.instances import tabs \
+    as instance_tabs
 from openstack_dashboard.dashboards.project.volumes import tables \
     as volumes_tables
 from openstack_dashboard.dashboards.project.volumes import tabs
+from openstack_dashboard.dashboards.project.volumes import urls \
+    as volumes_urls
 
 
 from horizon_pure.api import pure_flash_array
+from horizon_pure.pure_panel.volumes import views as pure_volumes_views
 
 
 LOG = logging.getLogger(__name__)
@@ -48,11 +61,76 @@ class PureVolumeTab(tabs.VolumeDetailTabs):
         return purified_volumes
 
 
+class PureAdminVolumesTable(admin_volumes_tables.VolumesTable):
+    pure_used = tables.Column('total', verbose_name=_("Purity Used"),
+                              filters=[sizeformat.mb_float_format])
+    data_reduction = tables.Column(
+        'data_reduction', verbose_name=_("Data Reduction"),
+        filters=[functools.partial(floatformat, arg=2)])
+    read_latency = tables.Column(
+        'usec_per_read_op', verbose_name=_("Read Latency (µs)"),
+        filters=[functools.partial(floatformat, arg=2)])
+    write_latency = tables.Column(
+        'usec_per_write_op', verbose_name=_("Write Latency (µs)"),
+        filters=[functools.partial(floatformat, arg=2)])
+
+    class Meta(admin_volumes_tables.VolumesTable.Meta):
+        # The admin table lists its columns, any column left out is dropped
+        columns = admin_volumes_tables.VolumesTable.Meta.columns + (
+            'pure_used', 'data_reduction', 'read_latency', 'write_latency')
+
+
+_get_admin_volumes_data = admin_volumes_views.VolumesView.get_data
+
+
+def get_purified_admin_volumes_data(self):
+    # Only the volumes of the current marker page get here, and they are
+    # looked up with a few batched queries per backend rather than one
+    # query per volume.
+    volumes = _get_admin_volumes_data(self)
+    return array_api.get_volumes_data(volumes)
+
+
+def get_purified_volumes(request, volumes):
+    """Returns the volumes with their Purity stats.
+
+    Volumes are looked up in one batch per backend and kept on the request,
+    so the pages and tabs rendered for one request share the lookups.
+    """
+    purified = getattr(request, '_pure_volumes', None)
+    if purified is None:
+        purified = request._pure_volumes = {}
+    missing = [vol for vol in volumes if vol.id not in purified]
+    if missing:
+        for purified_vol in array_api.get_volumes_data(missing):
+            purified[purified_vol.id] = purified_vol
+    return [purified[vol.id] for vol in volumes]
+
+
 def get_purified_volume_context_data(self, request):
     vol = self.tab_group.kwargs['volume']
-    purified_vol = array_api.get_volume_info(vol)
+    purified_vol = get_purified_volumes(request, [vol])[0]
     LOG.debug("Patched volume: " + str(purified_vol.to_dict()))
-    return {"volume": purified_vol}
+    return {"volume": purified_vol,
+            "history_ranges": list(pure_volumes_views.HISTORY_RANGES),
+            "default_history_range": pure_volumes_views.DEFAULT_HISTORY_RANGE}
+
+
+_get_instance_context_data = instance_tabs.OverviewTab.get_context_data
+
+
+def get_purified_instance_context_data(self, request):
+    """Adds the Purity stats of the instance's volumes to its overview.
+
+    The instance's volumes are Nova attachments, which do not carry the
+    Cinder host, so their backend is not known. They are looked for on
+    each array in turn with one batched query pair per array, until all
+    are found, costing up to two REST calls per configured array.
+    """
+    context = _get_instance_context_data(self, request)
+    volumes = getattr(context['instance'], 'volumes', None) or []
+    context['pure_volumes'] = get_purified_volumes(request, volumes)
+    return context
 
 
 LOG.debug("Setting overrides for Project VolumeAndSnapshotTabs.")
@@ -71,4 +149,20 @@ tabs.OverviewTab.template_name = "project/volumes/pure_detail_view.html"
 # so much from the array.
 tabs.OverviewTab.get_context_data = get_purified_volume_context_data
 
+LOG.debug("Setting overrides for Project Instances.")
+instance_tabs.OverviewTab.template_name = \
+    "project/instances/pure_detail_overview.html"
+instance_tabs.OverviewTab.get_context_data = get_purified_instance_context_data
+
+LOG.debug("Setting overrides for Admin Volumes.")
+admin_volumes_views.VolumesView.table_class = PureAdminVolumesTable
+admin_volumes_views.VolumesView.get_data = get_purified_admin_volumes_data
+
+# The performance history chart on the volume detail page loads its data
+# from here over AJAX.
+volumes_urls.urlpatterns.append(
+    re_path(r'^(?P<volume_id>[^/]+)/pure_performance/$',
+            pure_volumes_views.PerformanceHistoryView.as_view(),
+            name='pure_performance'))
+
 LOG.debug("Completed overrides for Project VolumeAndSnapshotTabs.")
@@ -19,6 +19,7 @@ from horizon import exceptions
 from horizon import tabs
 
 from horizon_pure.api import pure_flash_array
+from horizon_pure.pure_panel import summary
 
 
 class OverviewTab(tabs.Tab):
@@ -36,6 +37,8 @@ class OverviewTab(tabs.Tab):
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve FlashArray details.'))
+        # The cached summary needs its stamp even when the array is missing
+        context.update(summary.get_summary_context(context.get('array', {})))
 
         return context
 
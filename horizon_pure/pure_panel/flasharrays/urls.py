@@ -22,4 +22,7 @@ urlpatterns = [
     re_path(r'^(?P<backend_id>[^/]+)/$',
         views.DetailView.as_view(),
         name='detail'),
+    re_path(r'^(?P<backend_id>[^/]+)/performance/$',
+        views.PerformanceStreamView.as_view(),
+        name='performance'),
 ]
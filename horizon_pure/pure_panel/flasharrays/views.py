@@ -13,14 +13,46 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+import threading
+import time
 
+from django.conf import settings
+from django import http
 from django.urls import reverse
+from django.views import generic
 
 from horizon import tabs
 
+from horizon_pure.api import performance
+from horizon_pure.api import pure_flash_array
 from horizon_pure.pure_panel.flasharrays import tabs as flasharray_tabs
 
 
+# Streams are closed after this many seconds and the browser reconnects,
+# so a worker is not held by one page forever.
+STREAM_DURATION = 300
+
+# Each open stream holds a worker thread, so a process only serves this many
+# at once. Further pages get the latest sample and are told to reconnect
+# after FULL_RETRY seconds, which makes them poll slowly instead.
+MAX_STREAMS = 2
+FULL_RETRY = 60
+
+_STREAMS_LOCK = threading.Lock()
+_STREAM_SLOTS = None
+
+
+def _get_stream_slots():
+    global _STREAM_SLOTS
+    with _STREAMS_LOCK:
+        if _STREAM_SLOTS is None:
+            _STREAM_SLOTS = threading.BoundedSemaphore(
+                getattr(settings, 'PURE_PERFORMANCE_MAX_STREAMS',
+                        MAX_STREAMS))
+        return _STREAM_SLOTS
+
+
 class DetailView(tabs.TabView):
     tab_group_class = flasharray_tabs.FlashArrayDetailTabs
     template_name = 'horizon/common/_detail.html'
@@ -36,3 +68,66 @@ class DetailView(tabs.TabView):
 
     def get_data(self):
         return self.kwargs['backend_id']
+
+
+class PerformanceStreamView(generic.View):
+    """Server-Sent Events stream of an array's performance.
+
+    All streams of an array share one poller, and only the values that
+    changed since the last event are sent. When all of the process' stream
+    slots are taken the response carries one sample and a long retry.
+    """
+
+    def get(self, request, backend_id):
+        backends = [conf['backend_name']
+                    for conf in getattr(settings, 'PURE_FLASH_ARRAYS')]
+        if backend_id not in backends:
+            raise http.Http404()
+
+        response = http.StreamingHttpResponse(self._stream(backend_id),
+                                              content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    def _stream(self, backend_id):
+        # Taken once iterating starts, so a response that is never sent
+        # cannot keep a slot.
+        slots = _get_stream_slots()
+        if not slots.acquire(blocking=False):
+            sample = performance.get_latest_sample(
+                backend_id, pure_flash_array.FlashArrayAPI())
+            yield 'retry: %d\n\n' % (FULL_RETRY * 1000)
+            if sample:
+                yield 'data: %s\n\n' % json.dumps(sample)
+            return
+        try:
+            for event in self._stream_live(backend_id):
+                yield event
+        finally:
+            slots.release()
+
+    def _stream_live(self, backend_id):
+        interval = performance.get_poll_interval()
+        duration = getattr(settings, 'PURE_PERFORMANCE_STREAM_DURATION',
+                           STREAM_DURATION)
+        deadline = time.monotonic() + duration
+        poller = performance.get_poller(backend_id)
+        poller.subscribe()
+        try:
+            yield 'retry: %d\n\n' % (interval * 1000)
+            sent = {}
+            sequence = 0
+            while time.monotonic() < deadline:
+                sequence, sample = poller.wait(sequence, interval * 2)
+                delta = dict((key, value)
+                             for key, value in (sample or {}).items()
+                             if sent.get(key) != value)
+                if delta:
+                    sent.update(delta)
+                    yield 'data: %s\n\n' % json.dumps(delta)
+                else:
+                    # Keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+        finally:
+            poller.unsubscribe()
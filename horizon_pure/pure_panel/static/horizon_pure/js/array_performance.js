@@ -0,0 +1,50 @@
+/*
+ * Copyright (c) 2016 Pure Storage, Inc.
+ * All Rights Reserved.
+ *
+ *    Licensed under the Apache License, Version 2.0 (the "License"); you may
+ *    not use this file except in compliance with the License. You may obtain
+ *    a copy of the License at
+ *
+ *         http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *    Unless required by applicable law or agreed to in writing, software
+ *    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ *    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ *    License for the specific language governing permissions and limitations
+ *    under the License.
+ */
+
+/*
+ * Keeps the FlashArray performance values up to date from the server-sent
+ * events stream. Each event only holds the values that changed.
+ */
+(function () {
+  'use strict';
+
+  if (!window.EventSource) {
+    return;
+  }
+
+  document.querySelectorAll('.pure-array-performance').forEach(function (dl) {
+    if (dl.getAttribute('data-streaming')) {
+      return;
+    }
+    dl.setAttribute('data-streaming', 'true');
+
+    var source = new EventSource(dl.getAttribute('data-url'));
+    source.onmessage = function (event) {
+      if (!document.body.contains(dl)) {
+        source.close();
+        return;
+      }
+      var delta = JSON.parse(event.data);
+      Object.keys(delta).forEach(function (metric) {
+        var dd = dl.querySelector('[data-metric="' + metric + '"]');
+        if (dd) {
+          dd.textContent = Number(delta[metric]).toFixed(2);
+        }
+      });
+    };
+  });
+})();
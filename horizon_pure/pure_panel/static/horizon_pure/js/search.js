@@ -0,0 +1,84 @@
+/*
+ * Copyright (c) 2016 Pure Storage, Inc.
+ * All Rights Reserved.
+ *
+ *    Licensed under the Apache License, Version 2.0 (the "License"); you may
+ *    not use this file except in compliance with the License. You may obtain
+ *    a copy of the License at
+ *
+ *         http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *    Unless required by applicable law or agreed to in writing, software
+ *    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ *    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ *    License for the specific language governing permissions and limitations
+ *    under the License.
+ */
+
+/*
+ * Searches the FlashArray names as the user types and lists the matches
+ * with links to their array and, for Cinder volumes, the volume.
+ */
+(function () {
+  'use strict';
+
+  var DELAY = 200;
+  var KINDS = {volume: 'Volume', host: 'Host', pgroup: 'Protection Group'};
+
+  function link(text, url) {
+    var a = document.createElement('a');
+    a.textContent = text;
+    a.href = url;
+    return a;
+  }
+
+  function render(tbody, results, message) {
+    while (tbody.firstChild) {
+      tbody.removeChild(tbody.firstChild);
+    }
+    if (message) {
+      tbody.insertRow().insertCell().textContent = message;
+    }
+    results.forEach(function (result) {
+      var row = tbody.insertRow();
+      var name = row.insertCell();
+      if (result.volume_url) {
+        name.appendChild(link(result.name, result.volume_url));
+      } else {
+        name.textContent = result.name;
+      }
+      row.insertCell().textContent = KINDS[result.kind] || result.kind;
+      row.insertCell().appendChild(link(result.backend, result.array_url));
+    });
+  }
+
+  document.querySelectorAll('.pure-search').forEach(function (element) {
+    var input = element.querySelector('input');
+    var tbody = element.querySelector('.pure-search-results tbody');
+    var timer = null;
+    var latest = 0;
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        var query = input.value.trim();
+        var request = ++latest;
+        if (!query) {
+          render(tbody, []);
+          return;
+        }
+        var url = element.getAttribute('data-url') + '?q=' +
+          encodeURIComponent(query);
+        fetch(url, {credentials: 'same-origin'})
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            // Drop answers to queries the user has typed past
+            if (request === latest) {
+              render(tbody, data.results, data.building ?
+                element.getAttribute('data-building-text') : null);
+            }
+          });
+      }, DELAY);
+    });
+  });
+})();
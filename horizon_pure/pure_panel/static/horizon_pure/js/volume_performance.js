@@ -0,0 +1,111 @@
+/*
+ * Copyright (c) 2016 Pure Storage, Inc.
+ * All Rights Reserved.
+ *
+ *    Licensed under the Apache License, Version 2.0 (the "License"); you may
+ *    not use this file except in compliance with the License. You may obtain
+ *    a copy of the License at
+ *
+ *         http://www.apache.org/licenses/LICENSE-2.0
+ *
+ *    Unless required by applicable law or agreed to in writing, software
+ *    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+ *    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+ *    License for the specific language governing permissions and limitations
+ *    under the License.
+ */
+
+/*
+ * Loads the volume performance history over AJAX and draws it as simple
+ * SVG line charts, one per ".pure-volume-history-chart" element. The
+ * "data-columns" attribute selects which columns of each sample to plot.
+ */
+(function () {
+  'use strict';
+
+  var SVG_NS = 'http://www.w3.org/2000/svg';
+  var WIDTH = 600;
+  var HEIGHT = 120;
+  var COLORS = ['#1f77b4', '#ff7f0e'];
+
+  function drawChart(element, series, columns, emptyText) {
+    while (element.firstChild) {
+      element.removeChild(element.firstChild);
+    }
+    if (!series.length) {
+      element.textContent = emptyText;
+      return;
+    }
+
+    var start = series[0][0];
+    var span = Math.max(series[series.length - 1][0] - start, 1);
+    var max = 0;
+    series.forEach(function (sample) {
+      columns.forEach(function (column) {
+        max = Math.max(max, sample[column]);
+      });
+    });
+    max = max || 1;
+
+    var svg = document.createElementNS(SVG_NS, 'svg');
+    svg.setAttribute('viewBox', '0 0 ' + WIDTH + ' ' + HEIGHT);
+    svg.setAttribute('preserveAspectRatio', 'none');
+    svg.setAttribute('width', '100%');
+    svg.setAttribute('height', HEIGHT);
+
+    columns.forEach(function (column, index) {
+      var points = series.map(function (sample) {
+        var x = (sample[0] - start) / span * WIDTH;
+        var y = HEIGHT - sample[column] / max * HEIGHT;
+        return x.toFixed(1) + ',' + y.toFixed(1);
+      });
+      var line = document.createElementNS(SVG_NS, 'polyline');
+      line.setAttribute('points', points.join(' '));
+      line.setAttribute('fill', 'none');
+      line.setAttribute('stroke', COLORS[index % COLORS.length]);
+      line.setAttribute('vector-effect', 'non-scaling-stroke');
+      svg.appendChild(line);
+    });
+
+    var title = document.createElementNS(SVG_NS, 'title');
+    title.textContent = 'max ' + max.toFixed(2);
+    svg.appendChild(title);
+    element.appendChild(svg);
+  }
+
+  function load(container, range) {
+    var url = container.getAttribute('data-url') + '?range=' +
+      encodeURIComponent(range);
+    var emptyText = container.getAttribute('data-empty-text');
+    var charts = container.querySelectorAll('.pure-volume-history-chart');
+
+    container.querySelectorAll('button[data-range]').forEach(function (b) {
+      b.classList.toggle('active', b.getAttribute('data-range') === range);
+    });
+
+    fetch(url, {credentials: 'same-origin'})
+      .then(function (response) {
+        return response.ok ? response.json() : {series: []};
+      })
+      .then(function (data) {
+        charts.forEach(function (chart) {
+          var columns = chart.getAttribute('data-columns').split(',')
+            .map(Number);
+          drawChart(chart, data.series, columns, emptyText);
+        });
+      });
+  }
+
+  document.querySelectorAll('.pure-volume-history').forEach(function (c) {
+    if (c.getAttribute('data-loaded')) {
+      return;
+    }
+    c.setAttribute('data-loaded', 'true');
+    c.querySelectorAll('button[data-range]').forEach(function (button) {
+      button.addEventListener('click', function () {
+        load(c, button.getAttribute('data-range'));
+      });
+    });
+    load(c, c.getAttribute('data-range'));
+  });
+})();
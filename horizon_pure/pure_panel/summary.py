@@ -0,0 +1,39 @@
+# Copyright (c) 2016 Pure Storage, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+
+from django.conf import settings
+import hashlib
+
+from horizon_pure.api import pure_flash_array
+
+
+SUMMARY_CACHE_TIMEOUT = 3600
+
+
+def get_summary_context(stats):
+    """Returns the context of the cached pure_panel/_usage_summary.html.
+
+    The stamp changes with any of the stats the fragment shows, so a cached
+    fragment is used exactly as long as the numbers behind it are the same.
+    """
+    values = '|'.join('%r' % (stats.get(key),)
+                      for key in pure_flash_array.STATS_KEYS)
+    return {
+        'summary_stamp': hashlib.sha1(values.encode('utf-8')).hexdigest(),
+        'summary_cache_timeout': getattr(settings,
+                                         'PURE_SUMMARY_CACHE_TIMEOUT',
+                                         SUMMARY_CACHE_TIMEOUT),
+    }
@@ -4,6 +4,7 @@ import logging
 
 from horizon import tables
 from horizon.templatetags import sizeformat
+from horizon.utils import filters
 
 LOG = logging.getLogger(__name__)
 
@@ -12,6 +13,23 @@ class PureFilterAction(tables.FilterAction):
     name = "purefilter"
 
 
+class ExportCSVAction(tables.LinkAction):
+    name = "export_csv"
+    verbose_name = _("Export Volumes (CSV)")
+    icon = "download"
+    export_format = "csv"
+
+    def get_link_url(self, datum=None):
+        return '%s?format=%s' % (reverse('horizon:admin:pure_panel:export'),
+                                 self.export_format)
+
+
+class ExportNDJSONAction(ExportCSVAction):
+    name = "export_ndjson"
+    verbose_name = _("Export Volumes (NDJSON)")
+    export_format = "ndjson"
+
+
 def get_purity_url(array_info):
     LOG.debug('Building url for array %s' % array_info.cinder_id)
     return 'https://%s/' % array_info.target
@@ -50,5 +68,75 @@ class PureFlashArrayTable(tables.DataTable):
     class Meta(object):
         name = 'flasharrays'
         verbose_name = _('Everpure FlashArrays')
+        table_actions = (PureFilterAction, ExportCSVAction,
+                         ExportNDJSONAction)
+        multi_select = False
+
+
+class PureProjectUsageTable(tables.DataTable):
+    project_name = tables.WrappingColumn('project_name',
+                                         verbose_name=_('Project'))
+    project_id = tables.Column('id', verbose_name=_('Project ID'))
+    volume_count = tables.Column('volume_count',
+                                 verbose_name=_('Volume Count'))
+    provisioned = tables.Column('provisioned', verbose_name=_('Provisioned'),
+                                filters=[sizeformat.mb_float_format])
+    physical = tables.Column('physical', verbose_name=_('Physical'),
+                             filters=[sizeformat.mb_float_format])
+    snapshots = tables.Column('snapshots', verbose_name=_('Snapshots'),
+                              filters=[sizeformat.mb_float_format])
+
+    class Meta(object):
+        name = 'projects'
+        verbose_name = _('Everpure Usage by Project')
+        table_actions = (PureFilterAction,)
+        multi_select = False
+
+
+def get_snapshot_kind(source):
+    if source.kind == 'pgroup':
+        return _('Protection Group')
+    return _('Volume')
+
+
+class PureSnapshotSourceTable(tables.DataTable):
+    name = tables.WrappingColumn('name', verbose_name=_('Source'))
+    kind = tables.Column(get_snapshot_kind, verbose_name=_('Type'))
+    cinder_id = tables.Column('cinder_id', verbose_name=_('Cinder Volume ID'))
+    backend = tables.Column('backend', verbose_name=_('Cinder Name'))
+    snapshot_count = tables.Column('snapshot_count',
+                                   verbose_name=_('Snapshots'))
+    limit_used = tables.Column('limit_used',
+                               verbose_name=_('% of Snapshot Limit'),
+                               filters=[lambda value: '%.2f' % value])
+    space = tables.Column('space', verbose_name=_('Space Used'),
+                          filters=[sizeformat.mb_float_format])
+    oldest_age = tables.Column('oldest_age',
+                               verbose_name=_('Oldest Snapshot (days)'),
+                               filters=[lambda value: '%.1f' % value])
+
+    class Meta(object):
+        name = 'snapshot_sources'
+        verbose_name = _('Top Snapshot Sources')
+        table_actions = (PureFilterAction,)
+        multi_select = False
+
+
+class PureAlertTable(tables.DataTable):
+    updated = tables.Column('updated', verbose_name=_('Updated'),
+                            filters=(filters.parse_isotime,
+                                     filters.timesince_sortable),
+                            attrs={'data-type': 'timesince'})
+    backend = tables.Column('backend', verbose_name=_('Cinder Name'))
+    severity = tables.Column('severity', verbose_name=_('Severity'))
+    state = tables.Column('state', verbose_name=_('State'))
+    component_name = tables.Column('component_name',
+                                   verbose_name=_('Component'))
+    summary = tables.WrappingColumn('summary', verbose_name=_('Summary'))
+    code = tables.Column('code', verbose_name=_('Code'))
+
+    class Meta(object):
+        name = 'alerts'
+        verbose_name = _('Everpure Alerts')
         table_actions = (PureFilterAction,)
         multi_select = False
@@ -13,12 +13,18 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime
+
 from django.utils.translation import gettext_lazy as _
 
 from horizon import exceptions
 from horizon import tabs
 import re
 
+from openstack_dashboard.api import base
+from openstack_dashboard.api import keystone
+
+from horizon_pure.api import cinder as pure_cinder_api
 from horizon_pure.api import pure_flash_array
 from horizon_pure.pure_panel import tables
 
@@ -71,7 +77,91 @@ class FlashArrayTab(tabs.TableTab):
             return []
 
 
+class ProjectsTab(tabs.TableTab):
+    name = _("Projects")
+    slug = "projects_tab"
+    table_classes = (tables.PureProjectUsageTable,)
+    template_name = "horizon/common/_detail_table.html"
+    preload = False
+
+    def get_projects_data(self):
+        try:
+            volume_projects = {}
+            for volumes in pure_cinder_api.volume_list_all_paged(
+                    self.request):
+                for vol in volumes:
+                    volume_projects[vol.id] = vol.tenant_id
+
+            array_api = pure_flash_array.FlashArrayAPI()
+            usage = array_api.get_project_usage(volume_projects)
+        except Exception:
+            exceptions.handle(self.request,
+                              _('Unable to retrieve project usage.'))
+            return []
+
+        try:
+            projects, has_more = keystone.tenant_list(self.request)
+            project_names = dict((p.id, p.name) for p in projects)
+        except Exception:
+            project_names = {}
+            exceptions.handle(self.request,
+                              _('Unable to retrieve project list.'))
+
+        data = []
+        for project_id, project_usage in usage.items():
+            project_usage['id'] = project_id
+            project_usage['project_name'] = project_names.get(project_id,
+                                                              project_id)
+            data.append(base.APIDictWrapper(project_usage))
+        return data
+
+
+class SnapshotsTab(tabs.TableTab):
+    name = _("Snapshots")
+    slug = "snapshots_tab"
+    table_classes = (tables.PureSnapshotSourceTable,)
+    template_name = "horizon/common/_detail_table.html"
+    preload = False
+
+    def get_snapshot_sources_data(self):
+        try:
+            array_api = pure_flash_array.FlashArrayAPI()
+            sources = array_api.get_snapshot_sources()
+        except Exception:
+            exceptions.handle(self.request,
+                              _('Unable to retrieve snapshot sources.'))
+            return []
+        return [base.APIDictWrapper(source) for source in sources]
+
+
+class AlertsTab(tabs.TableTab):
+    name = _("Alerts")
+    slug = "alerts_tab"
+    table_classes = (tables.PureAlertTable,)
+    template_name = "horizon/common/_detail_table.html"
+    preload = False
+
+    def get_alerts_data(self):
+        try:
+            array_api = pure_flash_array.FlashArrayAPI()
+            alerts = array_api.get_alerts()
+        except Exception:
+            exceptions.handle(self.request, _('Unable to retrieve alerts.'))
+            return []
+
+        data = []
+        for alert in alerts:
+            alert = dict(alert)
+            if alert['updated']:
+                # Purity times are milliseconds since the epoch
+                alert['updated'] = datetime.datetime.fromtimestamp(
+                    alert['updated'] / 1000,
+                    datetime.timezone.utc).isoformat()
+            data.append(base.APIDictWrapper(alert))
+        return data
+
+
 class PurePanelTabs(tabs.TabGroup):
     slug = "pure_panel_tabs"
-    tabs = (FlashArrayTab,)
+    tabs = (FlashArrayTab, ProjectsTab, SnapshotsTab, AlertsTab)
     sticky = True
@@ -13,10 +13,546 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
+import math
+import re
+import threading
+import time
+import types
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from horizon import tabs as horizon_tabs
 from horizon.test import helpers as test
 
+from openstack_dashboard.api import cinder
+
+from horizon_pure.api import pure_flash_array
+from horizon_pure.api import search
+from horizon_pure.api import sharding
+from horizon_pure.api import throttle
+from horizon_pure.pure_panel.flasharrays import tabs as flasharray_tabs
+from horizon_pure.pure_panel import summary
+from horizon_pure.pure_panel import tabs as pure_tabs
+from horizon_pure.pure_panel import views as pure_views
+
 
 class PurePanelTests(test.TestCase):
     # Unit tests for pure_panel.
     def test_me(self):
         self.assertTrue(1 + 1 == 2)
+
+
+BACKENDS = ['pure-1', 'pure-2']
+
+
+def _obj(**kwargs):
+    return types.SimpleNamespace(**kwargs)
+
+
+class FakeResponse(object):
+    def __init__(self, items=(), total_item_count=None,
+                 continuation_token=None):
+        self.status_code = 200
+        self.items = list(items)
+        self.total_item_count = total_item_count
+        self.continuation_token = continuation_token
+        self.errors = []
+
+
+def _page(items, limit=None, continuation_token=None):
+    # Like py-pure-client with a limit, returns one page and a token for
+    # the next one instead of fetching it.
+    start = int(continuation_token or 0)
+    end = start + limit if limit else len(items)
+    return FakeResponse(items[start:end],
+                        continuation_token=(str(end) if end < len(items)
+                                            else None))
+
+
+class FakeFlashArray(object):
+    """Stands in for flasharray.Client and counts the calls per endpoint."""
+
+    def __init__(self):
+        self.calls = collections.Counter()
+        self.volume_names = set()
+        self.snapshots = []
+        self.hosts = []
+        self.pgroups = []
+
+    def __getattr__(self, attr):
+        if not attr.startswith('get_'):
+            raise AttributeError(attr)
+
+        def call(**kwargs):
+            self.calls[attr] += 1
+            return getattr(self, '_' + attr)(**kwargs)
+        return call
+
+    def _space(self):
+        return _obj(total_provisioned=2 * 1024 ** 3,
+                    total_physical=1024 ** 3,
+                    snapshots=0,
+                    unique=1024 ** 3,
+                    data_reduction=3.0,
+                    thin_provisioning=0.5,
+                    total_reduction=6.0)
+
+    def _performance(self, name=None):
+        return _obj(name=name, queue_depth=1, reads_per_sec=10,
+                    writes_per_sec=20, usec_per_read_op=100,
+                    usec_per_write_op=200)
+
+    def _get_arrays(self, **kwargs):
+        return FakeResponse([_obj(id='1', name='array', version='6.8.5')])
+
+    def _get_arrays_space(self, **kwargs):
+        return FakeResponse([_obj(capacity=10 * 1024 ** 4,
+                                  space=self._space())])
+
+    def _get_arrays_performance(self, **kwargs):
+        return FakeResponse([self._performance()])
+
+    def _get_controllers(self, **kwargs):
+        return FakeResponse([_obj(model='FA-X50R2', version='6.8.5')])
+
+    def _get_volumes(self, names=None, filter=None, total_item_count=False,
+                     limit=None, continuation_token=None, **kwargs):
+        if total_item_count:
+            return FakeResponse(total_item_count=len(self.volume_names))
+        if filter:
+            names = re.findall(r"volume-[^']+-cinder", filter)
+        if names:
+            return FakeResponse([_obj(name=name, space=self._space())
+                                 for name in names
+                                 if name in self.volume_names])
+        return _page([_obj(name=name, space=self._space())
+                      for name in sorted(self.volume_names)],
+                     limit, continuation_token)
+
+    def _get_volumes_performance(self, names=None, **kwargs):
+        return FakeResponse([self._performance(name) for name in names
+                             if name in self.volume_names])
+
+    def _get_volume_snapshots(self, total_item_count=False, limit=None,
+                              continuation_token=None, **kwargs):
+        if total_item_count:
+            return FakeResponse(total_item_count=len(self.snapshots))
+        return _page(self.snapshots, limit, continuation_token)
+
+    def _get_hosts(self, total_item_count=False, limit=None,
+                   continuation_token=None, **kwargs):
+        if total_item_count:
+            return FakeResponse(total_item_count=len(self.hosts))
+        return _page([_obj(name=name) for name in self.hosts],
+                     limit, continuation_token)
+
+    def _get_protection_groups(self, total_item_count=False, limit=None,
+                               continuation_token=None, **kwargs):
+        if total_item_count:
+            return FakeResponse(total_item_count=len(self.pgroups))
+        return _page([_obj(name=name) for name in self.pgroups],
+                     limit, continuation_token)
+
+
+@override_settings(PURE_FLASH_ARRAYS=[
+    {'san_ip': '10.0.0.%d' % i, 'api_token': 'token', 'backend_name': name}
+    for i, name in enumerate(BACKENDS)])
+class RestCallBudgetTests(test.TestCase):
+    """Caps the number of REST calls each view makes to the arrays.
+
+    A change that makes a view query the arrays once per volume, or asks
+    for the same thing twice, should fail here.
+    """
+
+    def setUp(self):
+        super(RestCallBudgetTests, self).setUp()
+        pure_flash_array._CLIENTS.clear()
+        # Keep the name index build from adding calls to the budgets
+        warmup = mock.patch.object(search, 'start_warmup')
+        warmup.start()
+        self.addCleanup(warmup.stop)
+        self.arrays = dict((name, FakeFlashArray()) for name in BACKENDS)
+        patcher = mock.patch.object(
+            pure_flash_array.flasharray, 'Client',
+            side_effect=lambda target, **kwargs: self.arrays[
+                BACKENDS[int(target.rsplit('.', 1)[1])]])
+        self.client_class = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(pure_flash_array._CLIENTS.clear)
+
+    def _calls(self):
+        calls = collections.Counter()
+        for array in self.arrays.values():
+            calls.update(array.calls)
+        return calls
+
+    def assertBudget(self, budget):
+        calls = self._calls()
+        self.assertLessEqual(sum(calls.values()), budget, dict(calls))
+
+    def _make_volumes(self, count, backend='pure-1'):
+        volumes = []
+        for i in range(count):
+            vol_id = '%08d-0000-0000-0000-000000000000' % i
+            self.arrays[backend].volume_names.add('volume-%s-cinder' % vol_id)
+            volumes.append(cinder.Volume(_obj(**{
+                'id': vol_id,
+                'os-vol-host-attr:host': 'host@%s#pool' % backend,
+            })))
+        return volumes
+
+    def test_client_reuse(self):
+        for _request in range(3):
+            pure_flash_array.FlashArrayAPI().get_total_stats()
+        # One login per array for the lifetime of the worker process
+        self.assertEqual(len(BACKENDS), self.client_class.call_count)
+
+    def test_index_view(self):
+        view = pure_views.IndexView()
+        view.request = RequestFactory().get('/')
+        view.kwargs = {}
+        # The tab group's own data is covered by the tab tests
+        with mock.patch.object(horizon_tabs.TabbedTableView,
+                               'get_context_data', return_value={}):
+            context = view.get_context_data()
+        self.assertIn('total_used', context['stats'])
+        # get_controllers, four counts and get_arrays_space per array
+        self.assertBudget(6 * len(BACKENDS))
+
+    def test_flasharray_tab(self):
+        tab = mock.Mock(array_api=None)
+        arrays = pure_tabs.FlashArrayTab.get_flasharrays_data(tab)
+        self.assertEqual(len(BACKENDS), len(arrays))
+        # get_arrays, get_arrays_space, get_controllers and four counts
+        self.assertBudget(7 * len(BACKENDS))
+        self.assertEqual(len(BACKENDS), self._calls()['get_arrays_space'])
+
+    def test_flasharray_overview_tab(self):
+        tab = flasharray_tabs.OverviewTab.__new__(flasharray_tabs.OverviewTab)
+        tab.tab_group = mock.Mock(kwargs={'backend_id': 'pure-1'})
+        tab.request = mock.Mock()
+        context = tab.get_context_data(tab.request)
+        self.assertEqual('Connected', context['array'].status)
+        # The FlashArray tab calls plus get_arrays_performance
+        self.assertBudget(8)
+
+    def test_volume_overview_tab(self):
+        from horizon_pure import overrides
+
+        volume = self._make_volumes(1)[0]
+        tab = mock.Mock()
+        tab.tab_group.kwargs = {'volume': volume}
+        with mock.patch.object(overrides, 'array_api',
+                               pure_flash_array.FlashArrayAPI()):
+            context = overrides.get_purified_volume_context_data(
+                tab, RequestFactory().get('/'))
+        self.assertEqual(100, context['volume'].usec_per_read_op)
+        # get_volumes and get_volumes_performance
+        self.assertBudget(2)
+
+    def test_instance_overview_tab(self):
+        from horizon_pure import overrides
+
+        # Nova attachments carry the volume id and name, not the host
+        instance = _obj(volumes=[
+            _obj(id=vol.id, name=vol.id)
+            for vol in self._make_volumes(5, backend=BACKENDS[-1])])
+        with mock.patch.object(overrides, 'array_api',
+                               pure_flash_array.FlashArrayAPI()), \
+                mock.patch.object(overrides, '_get_instance_context_data',
+                                  return_value={'instance': instance}):
+            context = overrides.get_purified_instance_context_data(
+                mock.Mock(), RequestFactory().get('/'))
+        self.assertEqual(5, len(context['pure_volumes']))
+        # One get_volumes and get_volumes_performance per array at most
+        self.assertBudget(2 * len(BACKENDS))
+
+    def test_project_usage(self):
+        volumes = self._make_volumes(7)
+        volume_projects = dict((vol.id, 'project') for vol in volumes)
+        with mock.patch.object(pure_flash_array, 'ARRAY_LIST_PAGE_SIZE', 3):
+            usage = pure_flash_array.FlashArrayAPI().get_project_usage(
+                volume_projects)
+        # Every page is read, not only the first one
+        self.assertEqual(7, usage['project']['volume_count'])
+        self.assertEqual(3, self.arrays['pure-1'].calls['get_volumes'])
+
+    def test_snapshot_sources(self):
+        day = 24 * 60 * 60 * 1000
+        now = time.time() * 1000
+        snapshots = self.arrays['pure-1'].snapshots
+        for i in range(4):
+            snapshots.append(_obj(name='volume-a-cinder.%d' % i,
+                                  source=_obj(name='volume-a-cinder'),
+                                  space=_obj(total_physical=1024 ** 2),
+                                  created=now - i * day))
+        # Protection group snapshots count toward the group and the volume
+        snapshots.append(_obj(name='pg1.daily.volume-b-cinder',
+                              source=_obj(name='volume-b-cinder'),
+                              space=_obj(total_physical=1024 ** 2),
+                              created=now - 10 * day))
+        # A snapshot without its optional attributes is still counted
+        snapshots.append(_obj(name='volume-b-cinder.manual'))
+
+        with mock.patch.object(pure_flash_array, 'ARRAY_LIST_PAGE_SIZE', 2):
+            sources = pure_flash_array.FlashArrayAPI().get_snapshot_sources()
+        sources = dict(((s['backend'], s['kind'], s['name']), s)
+                       for s in sources)
+
+        volume_a = sources[('pure-1', 'volume', 'volume-a-cinder')]
+        self.assertEqual(4, volume_a['snapshot_count'])
+        self.assertEqual(4.0, volume_a['space'])
+        self.assertEqual('a', volume_a['cinder_id'])
+        self.assertAlmostEqual(3, volume_a['oldest_age'], places=2)
+        self.assertEqual(2, sources[('pure-1', 'volume',
+                                     'volume-b-cinder')]['snapshot_count'])
+        pgroup = sources[('pure-1', 'pgroup', 'pg1')]
+        self.assertEqual(1, pgroup['snapshot_count'])
+        self.assertIsNone(pgroup['cinder_id'])
+        self.assertEqual(3, len(sources))
+        # Six snapshots in pages of two
+        self.assertEqual(3, self.arrays['pure-1'].calls[
+            'get_volume_snapshots'])
+
+    def test_object_names(self):
+        self._make_volumes(5)
+        self.arrays['pure-1'].hosts = ['esx-%d' % i for i in range(4)]
+        self.arrays['pure-1'].pgroups = ['pg-1']
+        with mock.patch.object(pure_flash_array, 'ARRAY_LIST_PAGE_SIZE', 2):
+            names = pure_flash_array.FlashArrayAPI().get_object_names(
+                'pure-1')
+        self.assertEqual(5, len(names['volume']))
+        self.assertEqual(set(self.arrays['pure-1'].hosts), names['host'])
+        self.assertEqual({'pg-1'}, names['pgroup'])
+        # Every page of every kind is listed
+        calls = self.arrays['pure-1'].calls
+        self.assertEqual((3, 2, 1), (calls['get_volumes'],
+                                     calls['get_hosts'],
+                                     calls['get_protection_groups']))
+
+    def test_admin_volumes_table(self):
+        from horizon_pure import overrides
+
+        volumes = pure_flash_array.FlashArrayAPI().get_volumes_data(
+            self._make_volumes(1))
+        table = overrides.PureAdminVolumesTable(self.request, data=volumes)
+        shown = [column.name for column in table.get_columns()]
+        cells = dict((name, table.columns[name].get_data(volumes[0]))
+                     for name in ('pure_used', 'data_reduction',
+                                  'read_latency', 'write_latency'))
+        for name in cells:
+            self.assertIn(name, shown)
+        self.assertEqual('3.00', cells['data_reduction'])
+        self.assertEqual('100.00', cells['read_latency'])
+        self.assertEqual('200.00', cells['write_latency'])
+
+    def test_get_volumes_data(self):
+        array_api = pure_flash_array.FlashArrayAPI()
+        batch_size = pure_flash_array.VOLUME_BATCH_SIZE
+        for count in (1, 20, batch_size + 1, 500):
+            for array in self.arrays.values():
+                array.calls.clear()
+            volumes = self._make_volumes(count)
+            data = array_api.get_volumes_data(volumes)
+            self.assertEqual(count, len(data))
+            self.assertEqual(10, data[-1].reads_per_sec)
+            # One get_volumes and get_volumes_performance per batch
+            self.assertBudget(2 * math.ceil(count / batch_size))
+
+
+class NameIndexTests(test.TestCase):
+
+    def test_search(self):
+        index = search.NameIndex()
+        index.update('pure-1', 'host', {'esx-01', 'esx-02', 'db-esx'})
+        index.update('pure-2', 'pgroup', {'ESX-daily'})
+        self.assertEqual([('esx-01', 'host', 'pure-1'),
+                          ('esx-02', 'host', 'pure-1'),
+                          ('ESX-daily', 'pgroup', 'pure-2')],
+                         index.search('es'))
+        # Names starting with the query come before other matches
+        self.assertEqual([('esx-01', 'host', 'pure-1'),
+                          ('esx-02', 'host', 'pure-1'),
+                          ('ESX-daily', 'pgroup', 'pure-2'),
+                          ('db-esx', 'host', 'pure-1')],
+                         index.search('ESX'))
+        self.assertEqual([], index.search('esx-03'))
+
+    def test_update(self):
+        index = search.NameIndex()
+        names = set('volume-%d-cinder' % i for i in range(200))
+        index.update('pure-1', 'volume', names)
+        index.update('pure-1', 'volume',
+                     (names - {'volume-7-cinder'}) | {'volume-new-cinder'})
+        self.assertEqual([], index.search('volume-7-'))
+        self.assertEqual([('volume-new-cinder', 'volume', 'pure-1')],
+                         index.search('new'))
+        index.update('pure-1', 'volume', set())
+        self.assertEqual([], index.search('vo'))
+
+
+class UsageSummaryTests(test.TestCase):
+
+    def test_summary_stamp(self):
+        stats = dict((key, 1) for key in pure_flash_array.STATS_KEYS)
+        stamp = summary.get_summary_context(stats)['summary_stamp']
+        # Keys the summary does not show leave the stamp alone
+        self.assertEqual(stamp, summary.get_summary_context(
+            dict(stats, status='Connected'))['summary_stamp'])
+        self.assertNotEqual(stamp, summary.get_summary_context(
+            dict(stats, total_used=2))['summary_stamp'])
+
+    def test_summary_context_on_failure(self):
+        failing_api = mock.Mock()
+        failing_api.return_value.get_total_stats.side_effect = Exception
+        failing_api.return_value.get_array_info.side_effect = Exception
+
+        view = pure_views.IndexView()
+        view.request = RequestFactory().get('/')
+        view.kwargs = {}
+        tab = flasharray_tabs.OverviewTab.__new__(flasharray_tabs.OverviewTab)
+        tab.tab_group = mock.Mock(kwargs={'backend_id': 'pure-1'})
+        tab.request = view.request
+        with mock.patch.object(pure_flash_array, 'FlashArrayAPI',
+                               failing_api), \
+                mock.patch('horizon.exceptions.handle'), \
+                mock.patch.object(search, 'start_warmup'), \
+                mock.patch.object(horizon_tabs.TabbedTableView,
+                                  'get_context_data', return_value={}):
+            contexts = [view.get_context_data(),
+                        tab.get_context_data(tab.request)]
+        # The page still renders, with empty pie charts
+        for context in contexts:
+            self.assertEqual(summary.SUMMARY_CACHE_TIMEOUT,
+                             context['summary_cache_timeout'])
+            self.assertTrue(context['summary_stamp'])
+
+
+class ThrottledClientTests(test.TestCase):
+
+    def test_identical_calls_share_one_request(self):
+        started = threading.Event()
+        release = threading.Event()
+        array = mock.Mock()
+
+        def get_volumes(**kwargs):
+            started.set()
+            release.wait(5)
+            return FakeResponse([_obj(name='volume-1-cinder')])
+        array.get_volumes.side_effect = get_volumes
+
+        client = throttle.ThrottledClient(array, 'shared-array')
+        results = []
+
+        def call():
+            results.append(client.get_volumes(destroyed=False))
+        threads = [threading.Thread(target=call) for _i in range(2)]
+        threads[0].start()
+        started.wait(5)
+        threads[1].start()
+        # Give the second call time to find the first one in flight
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(1, array.get_volumes.call_count)
+        self.assertIs(results[0], results[1])
+        for result in results:
+            self.assertEqual(['volume-1-cinder'],
+                             [item.name for item in result.items])
+
+
+class FakeCollectingAPI(object):
+    def __init__(self, array_ids):
+        self.array_ids = array_ids
+        self.collected = []
+
+    def get_array_list(self):
+        return self.array_ids
+
+    def collect_array_info(self, array_id):
+        self.collected.append(array_id)
+        return {'total_used': 1}
+
+
+@override_settings(
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    PURE_SHARDED_POLLING=True,
+    PURE_SHARD_POLL_INTERVAL=60,
+    PURE_NODE_ID='node-1')
+class ShardingTests(test.TestCase):
+    ARRAYS = ['pure-%d' % i for i in range(30)]
+    NODES = ['node-1', 'node-2', 'node-3']
+
+    def setUp(self):
+        super(ShardingTests, self).setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = 1000000.0
+        patcher = mock.patch.object(sharding.time, 'time',
+                                    side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _owners(self, nodes):
+        return dict((array_id, sharding.get_owner(array_id, nodes))
+                    for array_id in self.ARRAYS)
+
+    def _collect(self):
+        # Collect locks last one interval, start each round without them
+        for array_id in self.ARRAYS:
+            cache.delete(sharding.COLLECT_LOCK_KEY % array_id)
+        array_api = FakeCollectingAPI(self.ARRAYS)
+        sharding.collect_once(array_api)
+        return array_api.collected
+
+    def test_only_owner_collects(self):
+        for node in self.NODES:
+            sharding.heartbeat(node)
+        owners = self._owners(self.NODES)
+
+        collected = self._collect()
+        self.assertEqual(sorted(a for a, node in owners.items()
+                                if node == 'node-1'), sorted(collected))
+        for array_id in collected:
+            self.assertEqual({'total_used': 1},
+                             sharding.get_published_info(array_id))
+            self.assertEqual('node-1', cache.get(
+                sharding.PUBLISHED_KEY % array_id)['node'])
+
+    def test_missing_node_loses_its_arrays(self):
+        for node in self.NODES:
+            sharding.heartbeat(node)
+        before = self._owners(self.NODES)
+
+        # node-3 misses three heartbeats, the others keep beating
+        self.now += 3 * 60 + 1
+        sharding.heartbeat('node-2')
+        nodes = sharding.heartbeat('node-1')
+        self.assertEqual(['node-1', 'node-2'], nodes)
+
+        after = self._owners(nodes)
+        for array_id, owner in before.items():
+            if owner == 'node-3':
+                self.assertIn(after[array_id], nodes)
+            else:
+                # Arrays of the nodes that stayed keep their owner
+                self.assertEqual(owner, after[array_id])
+        self.assertEqual(sorted(a for a, node in after.items()
+                                if node == 'node-1'),
+                         sorted(self._collect()))
+
+    def test_new_node_takes_only_its_share(self):
+        before = self._owners(self.NODES)
+        after = self._owners(self.NODES + ['node-4'])
+        moved = [a for a in self.ARRAYS if before[a] != after[a]]
+        self.assertTrue(moved)
+        # Only arrays the new node now owns move
+        for array_id in moved:
+            self.assertEqual('node-4', after[array_id])
@@ -22,6 +22,8 @@ from horizon_pure.pure_panel.flasharrays import urls as array_urls
 
 urlpatterns = [
     re_path(r'^$', views.IndexView.as_view(), name='index'),
+    re_path(r'^export/$', views.ExportView.as_view(), name='export'),
+    re_path(r'^search/$', views.SearchView.as_view(), name='search'),
     re_path(r'', include((
         array_urls,
         'flasharrays'))),
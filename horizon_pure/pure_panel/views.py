@@ -13,21 +13,58 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import csv
+import json
+
+from django import http
+from django.urls import reverse
 from django.utils.translation import gettext_lazy as _
+from django.views import generic
 
 from horizon import exceptions
 from horizon import tabs
 
+from horizon_pure.api import cinder as pure_cinder_api
 from horizon_pure.api import pure_flash_array
+from horizon_pure.api import search
+from horizon_pure.pure_panel import summary
 from horizon_pure.pure_panel import tabs as pure_tabs
 
 
+EXPORT_FIELDS = [
+    'id',
+    'name',
+    'project_id',
+    'backend',
+    'status',
+    'size',
+    'volume_type',
+    'total',
+    'data_reduction',
+    'thin_provisioning',
+    'total_reduction',
+    'reads_per_sec',
+    'writes_per_sec',
+    'input_per_sec',
+    'output_per_sec',
+    'usec_per_read_op',
+    'usec_per_write_op',
+]
+EXPORT_CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
 class IndexView(tabs.TabbedTableView):
     template_name = 'pure_panel/index.html'
     tab_group_class = pure_tabs.PurePanelTabs
     page_title = "Everpure"
 
     def get_context_data(self, **kwargs):
+        # The name search is only ever used from here, so its index is not
+        # built until the panel is first opened.
+        search.start_warmup(pure_flash_array.FlashArrayAPI)
         context = super(IndexView, self).get_context_data(**kwargs)
         try:
             array_api = pure_flash_array.FlashArrayAPI()
@@ -35,4 +72,101 @@ class IndexView(tabs.TabbedTableView):
         except Exception:
             exceptions.handle(self.request,
                               _('Unable to retrieve Flash Array statistics.'))
+        # The cached summary needs its stamp even when the stats are missing
+        context.update(summary.get_summary_context(context.get("stats", {})))
         return context
+
+
+class _EchoBuffer(object):
+    """File-like object handing back what csv.writer writes to it."""
+    def write(self, value):
+        return value
+
+
+def iter_volume_inventory(request, array_api):
+    """Yields a row dict for every Cinder volume joined with Purity stats.
+
+    Cinder is paged through PURE_VOLUME_LIST_BATCH_SIZE volumes at a time
+    and each page is enriched with one batch of array queries per backend,
+    so only one page is held in memory at a time.
+    """
+    for volumes in pure_cinder_api.volume_list_all_paged(request):
+        stats = array_api.get_volumes_stats(volumes)
+        for vol in volumes:
+            row = {
+                'id': vol.id,
+                'name': vol.name,
+                'project_id': vol.tenant_id,
+                'backend': array_api.get_volume_backend(vol),
+                'status': vol.status,
+                'size': vol.size,
+                'volume_type': vol.volume_type,
+            }
+            row.update(stats.get(vol.id, {}))
+            yield row
+
+
+class ExportView(generic.View):
+    """Streams the Pure enriched volume inventory as CSV or NDJSON."""
+
+    def get(self, request):
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_CONTENT_TYPES:
+            return http.HttpResponseBadRequest()
+
+        array_api = pure_flash_array.FlashArrayAPI()
+        rows = iter_volume_inventory(request, array_api)
+        if export_format == 'csv':
+            content = self._iter_csv(rows)
+        else:
+            content = self._iter_ndjson(rows)
+
+        response = http.StreamingHttpResponse(
+            content, content_type=EXPORT_CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = (
+            'attachment; filename="pure_volumes.%s"' % export_format)
+        return response
+
+    def _iter_csv(self, rows):
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            yield writer.writerow([row.get(field, '')
+                                   for field in EXPORT_FIELDS])
+
+    def _iter_ndjson(self, rows):
+        for row in rows:
+            yield json.dumps(dict((field, row.get(field))
+                                  for field in EXPORT_FIELDS)) + '\n'
+
+
+class SearchView(generic.View):
+    """Looks names up in the fleet-wide FlashArray name index.
+
+    Lookups never reach the arrays, the index is refreshed from bulk
+    listings every PURE_SEARCH_REFRESH_INTERVAL seconds. Until a process
+    has built its index the results are empty and flagged as building.
+    """
+
+    def get(self, request):
+        index = search.get_index(pure_flash_array.FlashArrayAPI())
+        if index is None:
+            return http.JsonResponse({'results': [], 'building': True})
+        results = []
+        for name, kind, array_id in index.search(request.GET.get('q', '')):
+            result = {
+                'name': name,
+                'kind': kind,
+                'backend': array_id,
+                'array_url': reverse(
+                    'horizon:admin:pure_panel:flasharrays:detail',
+                    kwargs={'backend_id': array_id}),
+                'volume_url': None,
+            }
+            cinder_id = (pure_flash_array.get_cinder_volume_id(name)
+                         if kind == 'volume' else None)
+            if cinder_id:
+                result['volume_url'] = reverse(
+                    'horizon:admin:volumes:detail', args=[cinder_id])
+            results.append(result)
+        return http.JsonResponse({'results': results, 'building': False})
@@ -0,0 +1,69 @@
+# Copyright (c) 2016 Pure Storage, Inc.
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from django import http
+from django.views import generic
+
+from horizon import exceptions
+
+from openstack_dashboard.api import cinder
+
+from horizon_pure.api import pure_flash_array
+
+
+# Window and resolution of each history range, in milliseconds. The
+# resolutions are ones Purity keeps samples for, so the array does the
+# downsampling and every range stays at a few hundred points.
+HISTORY_RANGES = {
+    '1h': (60 * 60 * 1000, 30 * 1000),
+    '24h': (24 * 60 * 60 * 1000, 5 * 60 * 1000),
+    '7d': (7 * 24 * 60 * 60 * 1000, 30 * 60 * 1000),
+    '30d': (30 * 24 * 60 * 60 * 1000, 2 * 60 * 60 * 1000),
+}
+DEFAULT_HISTORY_RANGE = '24h'
+
+HISTORY_FIELDS = [
+    'time',
+    'reads_per_sec',
+    'writes_per_sec',
+    'usec_per_read_op',
+    'usec_per_write_op',
+]
+
+
+class PerformanceHistoryView(generic.View):
+    def get(self, request, volume_id):
+        history_range = request.GET.get('range', DEFAULT_HISTORY_RANGE)
+        if history_range not in HISTORY_RANGES:
+            return http.HttpResponseBadRequest()
+        window, resolution = HISTORY_RANGES[history_range]
+
+        # Looking the volume up through Cinder keeps tenants to their own
+        # volumes.
+        try:
+            volume = cinder.volume_get(request, volume_id)
+        except Exception:
+            exceptions.handle(request, ignore=True)
+            return http.HttpResponseNotFound()
+
+        array_api = pure_flash_array.FlashArrayAPI()
+        series = array_api.get_volume_performance_history(volume, window,
+                                                          resolution)
+        return http.JsonResponse({
+            'range': history_range,
+            'resolution': resolution,
+            'fields': HISTORY_FIELDS,
+            'series': series,
+        })